@@ -2,12 +2,22 @@ import logging
 import asyncio
 
 from .const import DOMAIN, PLATFORMS
+from .fleet import FleetScheduler
+from .household import HouseholdRegistry
 
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry):
     hass.data.setdefault(DOMAIN, {})
+
+    # 모든 config entry 가 공유하는 폴링 스케줄러 (서버별 연결 수/요청 속도, 전체 동시성 제한)
+    if "fleet" not in hass.data[DOMAIN]:
+        hass.data[DOMAIN]["fleet"] = FleetScheduler()
+
+    # 같은 세대를 조회하는 config entry 간 폴링 공유
+    if "households" not in hass.data[DOMAIN]:
+        hass.data[DOMAIN]["households"] = HouseholdRegistry()
     
     # options에서 update_interval을 가져와서 data에 병합
     if entry.options:
@@ -17,7 +27,13 @@ async def async_setup_entry(hass, entry):
         }
         hass.config_entries.async_update_entry(entry, data=data)
     
-    hass.data[DOMAIN][entry.entry_id] = entry.data
+    # 센서 플랫폼에서 생성하는 API 세션, 저장소, coordinator 보관용 (다시 로드 여부 판단용 설정 포함)
+    hass.data[DOMAIN][entry.entry_id] = {"settings": _settings(entry)}
+
+    # 서비스 등록 (월별 이력 가져오기 등)
+    from .services import async_register_services
+
+    async_register_services(hass)
 
     # 설정 변경 지원
     entry.async_on_unload(entry.add_update_listener(update_listener))
@@ -28,10 +44,22 @@ async def async_setup_entry(hass, entry):
 
     return True
 
+def _settings(entry):
+    """다시 로드 여부 판단용 설정 (확인된 단지 서버 IP 는 실행 중 갱신되므로 제외)"""
+    return {key: value for key, value in entry.data.items() if key != "ip"}, dict(entry.options)
+
 async def update_listener(hass, entry):
-    """설정이 업데이트되면 호출됨"""
+    """설정이 업데이트되면 호출됨 (확인된 단지 서버 IP 저장만 바뀐 경우 다시 로드하지 않음)"""
+    if hass.data[DOMAIN].get(entry.entry_id, {}).get("settings") == _settings(entry):
+        return
     await hass.config_entries.async_reload(entry.entry_id)
 
+async def async_remove_entry(hass, entry):
+    """통합 구성요소 삭제 시 저장 데이터 제거"""
+    from .store import KocomEnergyStore
+
+    await KocomEnergyStore(hass, entry.entry_id).async_remove()
+
 async def async_unload_entry(hass, entry):
     """통합 구성요소 제거"""
     unload_ok = all(
@@ -46,4 +74,13 @@ async def async_unload_entry(hass, entry):
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
 
+        # 로드된 config entry 가 더 이상 없으면 서비스 해제
+        if not any(
+            other.entry_id in hass.data[DOMAIN]
+            for other in hass.config_entries.async_entries(DOMAIN)
+        ):
+            from .services import async_unregister_services
+
+            async_unregister_services(hass)
+
     return unload_ok
@@ -0,0 +1,114 @@
+import statistics
+from collections import deque
+
+from .const import (
+    ADAPTIVE_BACKOFF,
+    ADAPTIVE_GRACE,
+    ADAPTIVE_HISTORY,
+    ADAPTIVE_MIN_SAMPLES,
+    ADAPTIVE_MONTH_WINDOW,
+)
+from .util import add_months
+
+
+class AdaptiveInterval:
+    """서버 검침값이 실제로 바뀌는 주기를 학습해 다음 폴링 간격을 결정
+
+    - 값이 바뀐 시각 사이의 간격(중앙값)을 서버 갱신 주기로 보고 다음 갱신 직후에 폴링
+    - 값이 그대로면 간격을 점점 늘림 (야간 등)
+    - 월 경계 전후에는 최소 간격으로 폴링 (월 초기화 및 지난달 확정값 반영)
+    - 항상 minimum ~ maximum 범위 유지
+    """
+
+    def __init__(self, base, minimum, maximum, state=None):
+        self.base = base
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.interval = self._clamp(base)
+
+        self._values = None
+        self._last_change = None
+        self._last_poll = None
+        self._periods = deque(maxlen=ADAPTIVE_HISTORY)
+
+        if state:
+            self._values = tuple(state["values"]) if state.get("values") is not None else None
+            self._last_change = state.get("last_change")
+            self._last_poll = state.get("last_poll")
+            self._periods.extend(state.get("periods", []))
+
+    def _clamp(self, seconds):
+        return max(self.minimum, min(self.maximum, seconds))
+
+    @property
+    def period(self):
+        """학습된 서버 갱신 주기 (초), 표본이 부족하면 None"""
+        if len(self._periods) < ADAPTIVE_MIN_SAMPLES:
+            return None
+        return statistics.median(self._periods)
+
+    def as_dict(self):
+        """재시작 후 이어서 학습하기 위한 저장용 상태"""
+        return {
+            "values": list(self._values) if self._values is not None else None,
+            "last_change": self._last_change,
+            "last_poll": self._last_poll,
+            "periods": list(self._periods),
+        }
+
+    def update(self, values, now):
+        """폴링 결과를 반영하고 다음 폴링까지의 간격(초) 반환
+
+        values : 비교할 검침값 tuple (조회 실패 시 None)
+        now    : 현재 시각 (timezone aware datetime)
+        """
+        timestamp = now.timestamp()
+        changed = values is not None and self._values is not None and values != self._values
+
+        if changed:
+            # 실제 변경 시각은 이전 폴링과 이번 폴링 사이로 추정
+            changed_at = (self._last_poll + timestamp) / 2 if self._last_poll else timestamp
+            if self._last_change is not None:
+                self._periods.append(changed_at - self._last_change)
+            self._last_change = changed_at
+
+        if values is not None:
+            self._values = values
+            self._last_poll = timestamp
+
+        period = self.period
+        if values is None or self._last_change is None or not period:
+            # 학습 전 : 값이 바뀌거나 조회에 실패하면 기본 간격, 그대로면 점점 늘림
+            if values is None or changed:
+                interval = self.base
+            else:
+                interval = max(self.base, self.interval) * ADAPTIVE_BACKOFF
+        else:
+            elapsed = timestamp - self._last_change
+            if elapsed < period:
+                # 다음 예상 갱신 시각 직후에 폴링
+                interval = period - elapsed + ADAPTIVE_GRACE
+            elif elapsed < period * 2:
+                # 예상 시각이 지났는데 값이 그대로면 기본 간격으로 확인
+                interval = self.base
+            else:
+                # 오래 변화가 없으면 (야간 등) 점점 늘림
+                interval = self.interval * ADAPTIVE_BACKOFF
+
+        # 월 경계 전후에는 빠르게 폴링
+        if self._seconds_to_month_boundary(now) <= ADAPTIVE_MONTH_WINDOW:
+            interval = self.minimum
+
+        self.interval = self._clamp(interval)
+        return self.interval
+
+    @staticmethod
+    def _seconds_to_month_boundary(now):
+        """가장 가까운 월 경계(이번달 1일 0시 또는 다음달 1일 0시)까지 남은 시간 (초)"""
+        this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        year, month = add_months(now.year, now.month, 1)
+        next_month = this_month.replace(year=year, month=month)
+        return min(
+            (now - this_month).total_seconds(),
+            (next_month - now).total_seconds(),
+        )
@@ -2,371 +2,694 @@ import datetime
 import asyncio
 import logging
 import math
-
-from dateutil.relativedelta import relativedelta
-from .util import string_to_padded_hex, string_to_hex, hex_to_ascii, hex_to_double
-from .exceptions import AuthenticationError
+import random
+import struct
+from contextlib import nullcontext
+
+from .decoder import CLOSED_MONTH_FIELDS, decode_current_month, decode_energy, decode_history
+from .protocol import ERROR_RESPONSE_PREFIX, RequestEncoder, frame_opcode, read_frame
+from .metrics import PhaseMetrics
+from .capture import CAPTURE_TX, CAPTURE_RX
+from .fleet import CircuitBreaker
+from .util import add_months
+from .exceptions import (
+    KocomEnergyError,
+    AuthenticationError,
+    PipeliningUnsupportedError,
+    ConnectionFailedError,
+    ResponseTimeoutError,
+    ServerResponseError,
+)
+from .const import (
+    KEEPALIVE_INTERVAL,
+    HISTORY_MAX_MONTHS_PER_REQUEST,
+    HISTORY_MIN_MONTHS_PER_REQUEST,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF,
+    RETRY_BACKOFF_MAX,
+    CLOSED_MONTH_SETTLE_DAYS,
+)
 
 
 _LOGGER = logging.getLogger(__name__)
 
 class API:
 
-    # 인증관련 패킷
-    auth_req_format = "78563412000010017c01000000000000000000000000000000000000000000000000000000000000000000000000000000000000{username}{password}02000000{fcm}{phone}"
-    auth_req = ""
-    auth_resp_checker = "7856341201001001040000000000000000000000000000000000000000000000"
-
-    # 메뉴 관련 패킷
-    menu_req = "78563412b80b1001040000000000000000000000000000000000000000000000"
-
-    # 주소 관련 패킷
-    addr_req = "785634120200100120000000000000000000000000000000000000000000000018000000f00000000000000000000000000000000000000000000000"
-
-    # 에너지 관련 패킷
+    # 에너지 조회 유형
     energy_disp_type = ""
-    energy_req_type_1_format = "785634127800100120000000{town}0000{dong}0000{ho}000000000000{months_str}000000000000000000000000"
-    # energy_req_type_1_postfix = "000000000000000000000000"
-    
-    energy_req_type_3_format = "785634129001100148000000{town}0000{dong}0000{ho}000000000000020000000200000001000000{months_str}00{months_str}00312c322c332c342c350000000000000000000000"
-    # energy_req_type_3_postfix = "312c322c332c342c350000000000000000000000"
 
 
-    def __init__(self, ip, username, password, fcm, phone):
+    def __init__(self, ip, username, password, fcm, phone, keepalive_interval=KEEPALIVE_INTERVAL, metadata=None, scheduler=None, capture=None, pipelining=False, closed_months=None, keep_session=True):
         self.ip = ip
         self.port = 15000
         self.username = username
         self.password = password
         self.fcm = fcm
         self.phone = phone
-
-        # 인증 요청 패킷 조립
-        self.auth_req = self.auth_req_format.format(
-            username=self.username, 
-            password=self.password, 
-            fcm=self.fcm, 
-            phone=self.phone
-        )
-        _LOGGER.debug(f"인증 요청 패킷 조립 결과: {self.auth_req}")
-
-    async def authenticate(self):
+        self.keepalive_interval = keepalive_interval
+        self.scheduler = scheduler
+
+        # 서버별 circuit breaker (공유 스케줄러가 있으면 같은 서버의 entry 끼리 공유)
+        self.breaker = scheduler.breaker(ip) if scheduler is not None else CircuitBreaker()
+
+        # 파이프라인 모드 : 서로 의존하지 않는 요청을 응답을 기다리지 않고 이어서 전송
+        # 서버별 지원 여부는 공유 스케줄러에 기억 (지원하지 않는 서버는 순차 요청)
+        self.pipelining = pipelining
+        self._pipelining_support = scheduler.pipelining if scheduler is not None else {}
+
+        # 패킷 캡처 (PacketCapture, 사용하지 않으면 None)
+        self.capture = capture
+
+        # 인증된 연결을 폴링 간에 유지하기 위한 세션 상태
+        # keep_session 이 False 이면 조회마다 연결 후 종료 (keepalive 없음)
+        self.keep_session = keep_session
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+        self._keepalive_task = None
+        self._last_activity = 0.0
+
+        # 진행 중인 에너지 조회 (동시에 요청되면 하나의 조회 결과를 함께 사용)
+        self._inflight = None
+
+        # 세대 정보 캐시 (에너지 조회 유형, 타운/동/호). 서버 오류나 해석 실패 시에만 초기화
+        self.metadata = metadata
+
+        # 0100 유형의 마감된 지난 두 달 사용량 캐시 (확정된 뒤에는 이번달만 조회)
+        #   month      : 캐시를 만든 조회 월 (YYYYMM, 월이 바뀌면 전체 조회)
+        #   this_month : 그때 서버가 응답한 이번달 년월 (이번달만 조회한 응답 검증용)
+        #   settled    : 월이 바뀐 뒤 CLOSED_MONTH_SETTLE_DAYS 가 지나 지난달 값이 확정되었는지 여부
+        #   fields     : 전전달/지난달 년월 및 사용량 (CLOSED_MONTH_FIELDS)
+        self.closed_months = closed_months
+
+        # 마지막 에너지 요청의 조회 월 목록 (0100 유형, 응답 해석 방식 결정)
+        self._energy_months = None
+
+        # 마감 월 캐시 사용 시 이번달만 요청할지 여부 (서버가 거부하면 False 로 기억하고 세 달 전체 조회)
+        self.current_month_only = True
+
+        # 월별 이력 조회 시 한 번에 요청할 개월 수 (서버가 거부하면 줄여서 재시도)
+        self.history_batch_size = HISTORY_MAX_MONTHS_PER_REQUEST
+
+        # 요청 단계별 지연 시간, 실패 유형, 송수신 bytes (진단 센서/진단 정보)
+        self.metrics = PhaseMetrics()
+
+        # 요청 패킷 조립 (인증/메뉴/주소 요청은 한 번만 조립)
+        self.encoder = RequestEncoder(username, password, fcm, phone)
+
+    def set_address(self, ip):
+        """단지 서버 IP 변경. 유지 중인 연결은 그대로 사용하고 다음 재연결부터 새 IP 로 접속"""
+        if ip == self.ip:
+            return
+        _LOGGER.info(f"단지 서버 IP 변경, 다음 연결부터 사용 : {self.ip} -> {ip}")
+        self.ip = ip
+        self.breaker = self.scheduler.breaker(ip) if self.scheduler is not None else CircuitBreaker()
+
+    @property
+    def connected(self):
+        """인증된 연결이 유지되고 있는지 여부"""
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def pipelining_supported(self):
+        """현재 서버의 파이프라인 요청 지원 여부 (확인 전에는 None)"""
+        return self._pipelining_support.get(self.ip)
+
+    def _write(self, packet):
+        """요청 패킷 전송. 캡처 중이면 ring buffer 에 기록"""
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("요청 패킷 : %s", packet.hex())
+        if self.capture is not None:
+            self.capture.record(CAPTURE_TX, packet)
+        self.metrics.bytes_sent += len(packet)
+        self._writer.write(packet)
+
+    async def _read(self):
+        """응답 패킷 하나 수신. 서버가 연결을 끊은 경우 asyncio.IncompleteReadError 발생"""
+        frame = await read_frame(self._reader)
+        self.metrics.bytes_received += len(frame)
+        if self.capture is not None:
+            self.capture.record(CAPTURE_RX, frame)
+        return frame
+
+    async def _open(self):
+        """서버 연결 (인증 전)"""
+        _LOGGER.debug(f"========== 소켓 통신 시작 ==========")
+        _LOGGER.debug(f"ip : {self.ip}")
+        _LOGGER.debug(f"port : {self.port}")
+        with self.metrics.phase("connect"):
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.ip, self.port), timeout=10.0
+            )
+
+    async def _connect(self):
+        """서버 연결 후 인증. 인증 실패 시 AuthenticationError 발생"""
+        await self._open()
 
         try:
-            _LOGGER.debug(f"========== 소켓 통신 시작 ==========")
-            _LOGGER.debug(f"ip : {self.ip}")
-            _LOGGER.debug(f"port : {self.port}")
-            reader, writer = await asyncio.open_connection(self.ip, self.port)
+            with self.metrics.phase("auth"):
+                # 인증 정보 전송
+                self._write(self.encoder.auth)
+                await self._writer.drain()
 
-            # 인증 정보 전송
-            writer.write(bytes.fromhex(self.auth_req))
-            await writer.drain()
+                # 인증 응답 대기 (10초 timeout 설정)
+                self._check_auth(await asyncio.wait_for(self._read(), timeout=10.0))
+        except BaseException:
+            await self._disconnect()
+            raise
 
-            # 인증 응답 대기 (10초 timeout 설정)
-            auth_response = (await asyncio.wait_for(reader.read(1024), timeout=10.0)).hex()
-            _LOGGER.debug(f'인증 응답 패킷: {auth_response}')
+        self._authenticated()
 
-            if auth_response == self.auth_resp_checker:
-                _LOGGER.debug("인증 성공")
-                return True
+    def _check_auth(self, auth_response):
+        """인증 응답 확인. 인증 실패 시 AuthenticationError 발생"""
+        _LOGGER.debug('인증 응답 패킷: %s', auth_response.hex())
 
-            _LOGGER.error(f'인증 실패, 요청 패킷 : {self.auth_req}')
+        if auth_response != self.encoder.auth_ok:
+            _LOGGER.error(f'인증 실패, 요청 패킷 : {self.encoder.auth.hex()}')
             raise AuthenticationError("인증 정보가 올바르지 않습니다.")
 
-        except asyncio.TimeoutError:
-            _LOGGER.debug("인증 timeout")
-        except Exception as e:
-            _LOGGER.error("소켓 통신 오류: %s", e)
-        finally:
-            # 연결 종료
-            writer.close()
-            await writer.wait_closed()
-
-        return False
+    def _authenticated(self):
+        _LOGGER.debug("인증 성공")
 
-    async def get_energy_data(self):
-        
-        try:
-            energy_response_dict = {}
+        # 연결 유지 패킷 전송 작업 시작
+        self._last_activity = asyncio.get_running_loop().time()
+        if self.keep_session and self.keepalive_interval and self._keepalive_task is None:
+            self._keepalive_task = asyncio.get_running_loop().create_task(self._keepalive())
 
-            _LOGGER.debug(f"========== 소켓 통신 시작 ==========")
-            _LOGGER.debug(f"ip : {self.ip}")
-            _LOGGER.debug(f"port : {self.port}")
-            reader, writer = await asyncio.open_connection(self.ip, self.port)
+    async def _disconnect(self):
+        """연결 종료 (연결 유지 작업 포함)"""
+        task, self._keepalive_task = self._keepalive_task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
 
-            # 인증 정보 전송
-            writer.write(bytes.fromhex(self.auth_req))
-            await writer.drain()
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is None:
+            return
 
-            # 인증 응답 대기 (10초 timeout 설정)
-            try:
-                auth_response = (await asyncio.wait_for(reader.read(1024), timeout=10.0)).hex()
-                _LOGGER.debug(f'인증 응답 패킷: {auth_response}')
-            except asyncio.TimeoutError:
-                _LOGGER.error("인증 timeout")
-                return {}
-
-            if auth_response == self.auth_resp_checker:
-                _LOGGER.debug("인증 성공")
-                
-                # 메뉴 정보 조회 패킷 전송
-                _LOGGER.debug(f"메뉴 정보 조회 요청 패킷 : {self.menu_req}")
-                writer.write(bytes.fromhex(self.menu_req))
-                await writer.drain()
-                
-                # 메뉴 정보 조회 응답 대기 (10초 timeout 설정)
-                try:
-                    menu_response = (await asyncio.wait_for(reader.read(1024), timeout=10.0)).hex()
-                    _LOGGER.debug(f'메뉴 정보 응답 패킷: {menu_response}')
-                    _LOGGER.debug(f'에너지 조회 유형 : {menu_response[96:100]}')
-                    
-                    
-                    """# 에너지 조회 유형 세팅 (energyInfo.class)
-                    
-                    0100 인 경우
-                    |항목|전전달|지난달|이번달|
-                    |---|----|-----|----|
-                    전기    -
-                    가스    -
-                    수도    -
-                    온수    -
-                    난방    -
-
-                    0200 인 경우 아직 미식별됨 (항목을 제외한 열이 4개)
-
-                    0300 1, 2 두가지 유형이 있으나 1번만 처리
-                    |항목|사용량|증감|
-                    |---|----|---|
-                    전기    -
-                    수도    -
-                    온수    -
-                    가스    -
-                    난방    -
-
-                    """
-                    self.energy_disp_type = menu_response[96:100]
-                except asyncio.TimeoutError:
-                    _LOGGER.debug("주소 조회 요청 timeout")
+        _LOGGER.debug(f"========== 소켓 통신 종료 ==========")
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+    async def _keepalive(self):
+        """유휴 상태에서 서버가 연결을 끊지 않도록 메뉴 조회 패킷 전송 (마지막 요청 후 keepalive_interval 동안 요청이 없을 때만)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(max(0, self._last_activity + self.keepalive_interval - loop.time()))
+            async with self._lock:
+                if not self.connected:
                     return
-                
-                # 주소 조회 패킷 전송
-                _LOGGER.debug(f"주소 조회 요청 패킷 : {self.addr_req}")
-                writer.write(bytes.fromhex(self.addr_req))
-                await writer.drain()
-
-                # 주소 조회 응답 대기 (10초 timeout 설정)
+                if loop.time() - self._last_activity < self.keepalive_interval:
+                    continue
+                self._last_activity = loop.time()
                 try:
-                    addr_response = (await asyncio.wait_for(reader.read(1024), timeout=10.0)).hex()
-                    _LOGGER.debug(f'주소 응답 패킷: {addr_response}')
-                    _LOGGER.debug(f'타운: {addr_response[24:28]}')
-                    _LOGGER.debug(f'동: {addr_response[32:36]}')
-                    _LOGGER.debug(f'호: {addr_response[40:44]}')
-                except asyncio.TimeoutError:
-                    _LOGGER.debug("주소 조회 요청 timeout")
+                    async with self._slot():
+                        with self.metrics.phase("keepalive"):
+                            self._write(self.encoder.menu)
+                            await self._writer.drain()
+                            await asyncio.wait_for(self._read(), timeout=10.0)
+                except Exception as e:
+                    _LOGGER.debug(f"연결 유지 실패, 다음 조회 시 재연결: {e}")
+                    await self._disconnect()
                     return
 
-                # 에너지 조회 패킷 전송
-                energy_req_data = ""
-
-                if self.energy_disp_type == '0100':
-                    ########## 에너지 요청 데이터 가공 ##########
-                    now = datetime.datetime.now()
+    def _slot(self):
+        """공유 스케줄러가 있으면 서버별 동시성/속도 제한 슬롯, 없으면 제한 없음"""
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(self.ip)
 
-                    # 이전 달
-                    one_month_ago = now - relativedelta(months=1)
+    async def close(self):
+        """세션 종료 (config entry 제거 시 호출)"""
+        async with self._lock:
+            await self._disconnect()
 
-                    # 그 이전 달
-                    two_months_ago = now - relativedelta(months=2)
+    async def authenticate(self):
+        """인증 정보 확인 (설정 화면에서 사용, 연결은 유지하지 않음)"""
+        try:
+            await self._connect()
+            return True
+        except AuthenticationError:
+            pass
+        except asyncio.TimeoutError:
+            _LOGGER.debug("인증 timeout")
+        except Exception as e:
+            _LOGGER.error("소켓 통신 오류: %s", e)
+        finally:
+            # 연결 종료
+            await self._disconnect()
 
-                    months = [
-                        two_months_ago.strftime("%Y%m"),
-                        one_month_ago.strftime("%Y%m"),
-                        now.strftime("%Y%m"),
-                    ]
-                    months_str = ",".join(months)
-                    
-                    energy_req_data = self.energy_req_type_1_format.format(town=addr_response[24:28], dong=addr_response[32:36], ho=addr_response[40:44], months_str=string_to_hex(months_str))
-                    
-                elif self.energy_disp_type == '0300':
-                    ########## 에너지 요청 데이터 가공 ##########
-                    months_str = datetime.datetime.now().strftime("%Y-%m-00 00:00:00")
+        return False
 
-                    energy_req_data = self.energy_req_type_3_format.format(town=addr_response[24:28], dong=addr_response[32:36], ho=addr_response[40:44], months_str=string_to_hex(months_str))
+    async def get_energy_data(self):
+        """에너지 사용량 조회
+
+        이미 진행 중인 조회가 있으면 새 연결이나 요청 없이 그 결과를 함께 받는다.
+        """
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._get_energy_data())
+            self._inflight.add_done_callback(self._inflight_done)
+        return await asyncio.shield(self._inflight)
+
+    def _inflight_done(self, future):
+        if self._inflight is future:
+            self._inflight = None
+        # 기다리던 호출이 모두 취소된 경우에도 예외가 처리되지 않은 채 남지 않도록 확인
+        if not future.cancelled():
+            future.exception()
+
+    async def _get_energy_data(self):
+        """에너지 사용량 조회 한 건 (재시도/circuit breaker 는 _guarded 참고)"""
+        self.breaker.acquire()
+        try:
+            with self.metrics.phase("poll"):
+                energy_response_dict = await self._guarded(self._query)
+        except KocomEnergyError:
+            self.metrics.poll(False)
+            raise
 
-                _LOGGER.debug(f"에너지 정보 요청 패킷 : {energy_req_data}")
-                writer.write(bytes.fromhex(energy_req_data))
-                await writer.drain()
+        self.metrics.poll(True)
+        return energy_response_dict
 
-                # 조회 응답 대기 (10초 timeout 설정)
-                try:
-                    gnergy_response = (await asyncio.wait_for(reader.read(1024), timeout=10.0)).hex()
-                    _LOGGER.debug(f'에너지 정보 수신 패킷: {gnergy_response}')
-
-                    # 에너지 정보 수신 패킷 검증
-                    if len(gnergy_response) < 500:  # 정상적인 응답 패킷 길이보다 짧은 경우
-                        _LOGGER.error(f"비정상 응답 데이터 수신. 응답 길이: {len(gnergy_response)}")
-                        return None
-
-                    # 응답 헤더 검증 (첫 10자리)    
-                    if gnergy_response.startswith("7856341210"):
-                        _LOGGER.error(f"잘못된 응답 헤더: {gnergy_response[:10]}")
-                        return None
-
-                    if self.energy_disp_type == '0100':
-                        ########## 전전달 에너지 사용량 ##########
-                        _LOGGER.debug(f"에너지 사용량 조회 패턴 : {self.energy_disp_type}")
-                        # 전기
-                        start_idx = 64
-                        response_ym = hex_to_ascii(gnergy_response[start_idx + 8 : start_idx + 24])
-                        _LOGGER.debug(f"전전달 조회 년월 : {response_ym}, raw_data : {gnergy_response[start_idx + 8 : start_idx + 24]}")
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"전전달 전기 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["two_months_ago"] = response_ym
-                        energy_response_dict["electricity_usage_two_months_ago"] = usage
-
-                        # 가스
-                        start_idx = 120
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"전전달 가스 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["gas_usage_two_months_ago"] = usage
-
-                        # 수도
-                        start_idx = 176
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"전전달 수도 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["water_usage_two_months_ago"] = usage
-
-                        # 온수
-                        start_idx = 232
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"전전달 온수 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["hot_water_usage_two_months_ago"] = usage
-
-                        # 난방
-                        start_idx = 288
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"전전달 난방 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["heating_usage_two_months_ago"] = usage
-
-                        ########## 지난달 에너지 사용량 ##########
-                        
-                        # 전기
-                        start_idx = 344
-                        response_ym = hex_to_ascii(gnergy_response[start_idx + 8 : start_idx + 24])
-                        _LOGGER.debug(f"지난달 조회 년월 : {response_ym}, raw_data : {gnergy_response[start_idx + 8 : start_idx + 24]}")
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"지난달 전기 사용량 : {usage}, raw : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["last_month"] = response_ym
-                        energy_response_dict["electricity_usage_last_month"] = usage
-
-                        # 가스
-                        start_idx = 400
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"지난달 가스 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["gas_usage_last_month"] = usage
-
-                        # 수도
-                        start_idx = 456
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"지난달 수도 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["water_usage_last_month"] = usage
-
-                        # 온수
-                        start_idx = 512
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"지난달 온수 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["hot_water_usage_last_month"] = usage
-
-                        # 난방
-                        start_idx = 568
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"지난달 난방 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["heating_usage_last_month"] = usage
-
-                        ########## 이번달 에너지 사용량 ##########
-                        
-                        # 전기
-                        start_idx = 624
-                        response_ym = hex_to_ascii(gnergy_response[start_idx + 8 : start_idx + 24])
-                        _LOGGER.debug(f"이번달 조회 년월 : {response_ym}, raw_data : {gnergy_response[start_idx + 8 : start_idx + 24]}   ")
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"이번달 전기 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["this_month"] = response_ym
-                        energy_response_dict["electricity_usage_this_month"] = usage
-
-                        # 가스
-                        start_idx = 680
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"이번달 가스 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["gas_usage_this_month"] = usage
-
-                        # 수도
-                        start_idx = 736
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"이번달 수도 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["water_usage_this_month"] = usage
-
-                        # 온수
-                        start_idx = 792
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"이번달 온수 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["hot_water_usage_this_month"] = usage
-
-                        # 난방
-                        start_idx = 848
-                        usage = hex_to_double(gnergy_response[start_idx + 40 : start_idx + 56])
-                        _LOGGER.debug(f"이번달 난방 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 40 : start_idx + 56]}")
-                        energy_response_dict["heating_usage_this_month"] = usage
-                    
-                    elif self.energy_disp_type == '0300':
-                        _LOGGER.debug(f"에너지 사용량 조회 패턴 : {self.energy_disp_type}")
-                        # 전기
-                        start_idx = 184
-                        response_ym = hex_to_ascii(gnergy_response[start_idx + 8 : start_idx + 22])
-                        _LOGGER.debug(f"이번달 조회 년월 : {response_ym}, raw_data   : {gnergy_response[start_idx + 8 : start_idx + 22]}")
-                        usage = hex_to_double(gnergy_response[start_idx + 48 : start_idx + 64])
-                        _LOGGER.debug(f"이번달 전기 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 48 : start_idx + 64]}")
-                        energy_response_dict["this_month"] = response_ym
-                        energy_response_dict["electricity_usage_this_month"] = usage
-
-                        # 수도
-                        start_idx = 272
-                        usage = hex_to_double(gnergy_response[start_idx + 48 : start_idx + 64])
-                        _LOGGER.debug(f"이번달 수도 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 48 : start_idx + 64]}")
-                        energy_response_dict["water_usage_this_month"] = usage
-
-                        # 온수
-                        start_idx = 360
-                        usage = hex_to_double(gnergy_response[start_idx + 48 : start_idx + 64])
-                        _LOGGER.debug(f"이번달 온수 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 48 : start_idx + 64]}")
-                        energy_response_dict["hot_water_usage_this_month"] = usage
-
-                        # 가스
-                        start_idx = 448
-                        usage = hex_to_double(gnergy_response[start_idx + 48 : start_idx + 64])
-                        _LOGGER.debug(f"이번달 가스 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 48 : start_idx + 64]}")
-                        energy_response_dict["gas_usage_this_month"] = usage
-
-                        # 난방
-                        start_idx = 536
-                        usage = hex_to_double(gnergy_response[start_idx + 48 : start_idx + 64])
-                        _LOGGER.debug(f"이번달 난방 사용량 : {usage}, raw_data : {gnergy_response[start_idx + 48 : start_idx + 64]}")
-                        energy_response_dict["heating_usage_this_month"] = usage
-
-
-
-                except asyncio.TimeoutError:
-                    _LOGGER.error("응답시간이 초과되었습니다.")
-                    return {}
-            else:
-                _LOGGER.error(f"인증정보가 올바르지 않습니다.")
+    async def _guarded(self, query):
+        """circuit breaker 슬롯을 얻은 상태에서 _poll(query) 실행
 
-            _LOGGER.debug(f"========== 소켓 통신 종료 ==========")
-            return energy_response_dict
+        일시적인 오류는 jitter 를 적용한 지수 backoff 로 재시도하고, 최종 실패 시 KocomEnergyError 를 발생시킨다.
+        서버가 연속으로 응답하지 않으면 circuit breaker 가 열려 일정 시간 동안 요청 없이 CircuitOpenError 를 발생시킨다.
+        """
+        # 차단 후 시험 요청은 재시도 없이 한 번만
+        attempts = RETRY_ATTEMPTS if self.breaker.state == CircuitBreaker.CLOSED else 1
 
-        except Exception as e:
-            _LOGGER.error(f"소켓 통신 오류: {e}")
-        finally:
-            # 연결 종료
-            writer.close()
-            await writer.wait_closed()
+        try:
+            result = await self._retry(lambda: self._poll(query), attempts)
+        except (ConnectionFailedError, ResponseTimeoutError):
+            self.breaker.failure()
+            raise
+        except KocomEnergyError:
+            # 인증 실패, 오류 응답 등은 서버가 살아 있는 경우
+            self.breaker.success()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+
+        self.breaker.success()
+        return result
+
+    async def _retry(self, request, attempts):
+        """request 를 최대 attempts 번 시도 (인증 실패는 재시도하지 않음)"""
+        for attempt in range(attempts):
+            try:
+                return await request()
+            except AuthenticationError:
+                raise
+            except KocomEnergyError as e:
+                if attempt + 1 >= attempts:
+                    raise
+                delay = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt))
+                _LOGGER.debug(f"조회 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{attempts}): {e}")
+                await asyncio.sleep(delay)
+
+    async def _poll(self, query):
+        """query(reused) 한 번 실행 (에너지 사용량 또는 월별 이력 조회)
+
+        인증된 연결이 있으면 재사용하고, 서버가 연결을 끊은 경우에만 재연결 후 재인증 한다.
+        query 는 reused 가 False 이면 연결/인증부터 수행한다. keep_session 이 False 이면 조회 후 연결을 종료한다.
+        """
+        async with self._lock, self._slot():
+            try:
+                for attempt in range(2):
+                    reused = self.connected
+                    self.metrics.attempt()
+                    try:
+                        return await query(reused)
+
+                    except (ConnectionError, asyncio.IncompleteReadError) as e:
+                        await self._disconnect()
+                        if not reused or attempt > 0:
+                            raise ConnectionFailedError(f"서버 연결이 끊어졌습니다: {e}") from e
+                        # 유휴 연결을 서버가 끊은 경우는 실패가 아닌 재연결로 기록
+                        self.metrics.reconnect()
+                        _LOGGER.debug(f"유지된 연결이 끊어져 재연결 합니다: {e}")
+                    except asyncio.TimeoutError as e:
+                        await self._disconnect()
+                        raise ResponseTimeoutError("응답시간이 초과되었습니다.") from e
+                    except OSError as e:
+                        await self._disconnect()
+                        raise ConnectionFailedError(f"서버에 연결할 수 없습니다: {e}") from e
+                    except BaseException:
+                        # 비정상 응답 이후에는 스트림 상태를 신뢰할 수 없으므로 연결 종료
+                        await self._disconnect()
+                        raise
+            finally:
+                self._last_activity = asyncio.get_running_loop().time()
+                if not self.keep_session:
+                    await self._disconnect()
+
+    async def _query(self, reused):
+        """필요하면 연결/인증 후 에너지 정보 조회
+
+        파이프라인 모드에서 서버가 이어서 보낸 요청에 응답하지 못하면 서버별로 기억하고
+        연결을 새로 맺어 순차 요청으로 다시 조회한다.
+        """
+        # 이어서 보낼 요청이 둘 이상인 경우 (새 연결의 인증 또는 세대 정보 조회)
+        if self.pipelining and (not reused or self.metadata is None) and self._pipelining_support.get(self.ip, True):
+            if not reused:
+                await self._open()
+            try:
+                return await self._query_pipelined(authenticate=not reused)
+            except PipeliningUnsupportedError as e:
+                _LOGGER.warning(f"서버({self.ip})가 파이프라인 요청을 지원하지 않아 순차 요청으로 전환: {e}")
+                self._pipelining_support[self.ip] = False
+                await self._disconnect()
+                reused = False
+
+        if not reused:
+            await self._connect()
+        return await self._query_energy()
+
+    async def _query_pipelined(self, authenticate):
+        """인증/메뉴/주소 또는 인증/에너지 요청을 이어서 보내 응답 대기를 한 번으로 줄여 조회
+
+        세대 정보가 없으면 메뉴/주소 응답으로 확인한 뒤 에너지 요청만 따로 보낸다.
+        """
+        requests = [self.encoder.auth] if authenticate else []
+        if self.metadata is None:
+            requests += [self.encoder.menu, self.encoder.addr]
+        else:
+            requests.append(self._energy_request())
+
+        with self.metrics.phase("pipeline"):
+            responses = await self._pipeline(requests)
+
+        if authenticate:
+            self._check_auth(responses.pop(0))
+            self._authenticated()
+
+        if self.metadata is not None:
+            energy_response_dict = self._parse_energy(responses[0])
+            if energy_response_dict is not None:
+                return energy_response_dict
+            # 마감 월 캐시 검증 실패 또는 이번달만 요청 거부 : 같은 연결에서 세 달 전체 조회
+            return await self._query_energy()
+
+        self.metadata = self._parse_metadata(*responses)
+        return await self._query_energy()
+
+    async def _pipeline(self, requests):
+        """요청을 이어서 보낸 뒤 응답을 opcode(요청 opcode + 1)로 구분해 요청 순서대로 반환
+
+        오류 응답은 opcode 로 구분할 수 없으므로 응답이 없는 요청이 하나뿐일 때만 그 요청의 응답으로 본다.
+        첫 응답 이후 응답이 오지 않거나 연결이 끊기는 등 서버가 이어서 보낸 요청을 처리하지 못한 것으로 보이면
+        PipeliningUnsupportedError 발생. 인증 응답이 실패이면 바로 AuthenticationError 발생.
+        """
+        pending = {}
+        for index, packet in enumerate(requests):
+            pending[frame_opcode(packet) + 1] = index
+            self._write(packet)
+        await self._writer.drain()
+
+        responses = [None] * len(requests)
+        errors = []
+        for received in range(len(requests)):
+            try:
+                response = await asyncio.wait_for(self._read(), timeout=10.0)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError) as e:
+                # 응답이 하나도 없으면 순차 요청과 같은 연결 오류/응답 시간 초과
+                if not received:
+                    raise
+                raise PipeliningUnsupportedError(f"{len(requests)}개 요청 중 {received}개만 응답") from e
+
+            if response.startswith(ERROR_RESPONSE_PREFIX):
+                errors.append(response)
+                continue
+
+            index = pending.pop(frame_opcode(response), None)
+            if index is None:
+                raise PipeliningUnsupportedError(f"예상하지 않은 응답 opcode: {frame_opcode(response):04x}")
+            if requests[index] is self.encoder.auth:
+                self._check_auth(response)
+            responses[index] = response
+
+        if errors:
+            if len(errors) > 1 or len(pending) != 1:
+                raise PipeliningUnsupportedError(f"{len(requests)}개 요청 중 {len(errors)}개 오류 응답")
+            responses[pending.popitem()[1]] = errors[0]
+
+        if len(requests) > 1 and self.ip not in self._pipelining_support:
+            _LOGGER.debug(f"서버({self.ip}) 파이프라인 요청 지원 확인")
+            self._pipelining_support[self.ip] = True
+        return responses
+
+    async def _query_energy(self):
+        """인증된 연결에서 에너지 정보 조회 (세대 정보가 캐시되어 있으면 메뉴/주소 조회 생략)"""
+        if self.metadata is None:
+            self.metadata = await self._query_metadata()
+
+        energy_req_data = self._energy_request()
+
+        with self.metrics.phase("energy"):
+            self._write(energy_req_data)
+            await self._writer.drain()
+
+            # 조회 응답 대기 (10초 timeout 설정)
+            energy_response = await asyncio.wait_for(self._read(), timeout=10.0)
+
+            energy_response_dict = self._parse_energy(energy_response)
+
+        if energy_response_dict is None:
+            # 마감 월 캐시 검증 실패 또는 이번달만 요청 거부 : 같은 연결에서 세 달 전체 조회
+            return await self._query_energy()
+        return energy_response_dict
+
+    def _energy_request(self):
+        """세대 정보의 조회 유형에 맞는 에너지 조회 요청 패킷"""
+        self.energy_disp_type = self.metadata["disp_type"]
+        household = (self.metadata["town"], self.metadata["dong"], self.metadata["ho"])
+
+        # 에너지 조회 패킷 조립
+
+        if self.energy_disp_type == '0100':
+            ########## 에너지 요청 데이터 가공 ##########
+            now = datetime.datetime.now()
+            month = "%04d%02d" % (now.year, now.month)
+
+            closed = self.closed_months
+            if self.current_month_only and closed is not None and closed["month"] == month and closed["settled"]:
+                # 마감된 달은 캐시 사용, 이번달만 조회
+                months = [month]
+            else:
+                # 전전달, 지난달, 이번달
+                months = [
+                    "%04d%02d" % add_months(now.year, now.month, offset)
+                    for offset in (-2, -1, 0)
+                ]
+
+            self._energy_months = months
+            energy_req_data = self.encoder.energy_type_1(household, months)
+            
+        elif self.energy_disp_type == '0300':
+            ########## 에너지 요청 데이터 가공 ##########
+            months_str = datetime.datetime.now().strftime("%Y-%m-00 00:00:00")
+
+            energy_req_data = self.encoder.energy_type_3(household, months_str)
+
+        else:
+            self.metadata = None
+            raise ServerResponseError(f"지원하지 않는 에너지 조회 유형: {self.energy_disp_type}")
+
+        return energy_req_data
+
+    def _current_month_unsupported(self, reason):
+        """이번달만 요청을 서버가 처리하지 못한 경우 기억하고 None 반환 (같은 연결에서 세 달 전체 조회)"""
+        _LOGGER.warning(f"서버({self.ip})가 이번달만 요청을 처리하지 못해 세 달 전체 조회로 전환: {reason}")
+        self.metrics.failure("energy", "ServerResponseError")
+        self.current_month_only = False
+        return None
+
+    def _reset(self):
+        """서버 오류나 해석 실패 시 세대 정보와 마감 월 캐시 초기화"""
+        self.metadata = None
+        self.closed_months = None
+
+    def _parse_energy(self, energy_response):
+        """에너지 조회 응답 해석. 오류 응답이거나 해석할 수 없으면 ServerResponseError 발생"""
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug('에너지 정보 수신 패킷: %s', energy_response.hex())
+
+        # 이번달만 조회한 경우 캐시된 마감 월 값과 합침
+        current_only = self.energy_disp_type == "0100" and len(self._energy_months) == 1
+
+        # 응답 헤더 검증 (첫 5 bytes)
+        if energy_response.startswith(ERROR_RESPONSE_PREFIX):
+            if current_only:
+                return self._current_month_unsupported(f"오류 응답 {energy_response[:5].hex()}")
+            self._reset()
+            raise ServerResponseError(f"잘못된 응답 헤더: {energy_response[:5].hex()}")
+
+        # 조회 유형별 레이아웃으로 전체 사용량 해석
+        _LOGGER.debug(f"에너지 사용량 조회 패턴 : {self.energy_disp_type}")
+        try:
+            if current_only:
+                energy_response_dict = decode_current_month(energy_response, self.closed_months["fields"])
+            else:
+                energy_response_dict = decode_energy(self.energy_disp_type, energy_response)
+        except struct.error as e:
+            # 정상적인 응답 패킷 길이보다 짧은 경우
+            if current_only:
+                return self._current_month_unsupported(f"응답 길이 {len(energy_response)}")
+            self._reset()
+            raise ServerResponseError(f"비정상 응답 데이터 수신. 응답 길이: {len(energy_response)}") from e
+
+        if current_only and energy_response_dict.this_month != self.closed_months["this_month"]:
+            # 캐시를 만든 때와 응답 년월이 다르면 캐시를 버리고 세 달 전체 다시 조회
+            _LOGGER.debug(f"이번달 응답 년월 불일치 ({energy_response_dict.this_month} != {self.closed_months['this_month']}), 전체 조회")
+            self.closed_months = None
+            return None
+
+        if self.energy_disp_type == "0100" and not current_only:
+            self.closed_months = {
+                "month": self._energy_months[-1],
+                "this_month": energy_response_dict.this_month,
+                "settled": datetime.datetime.now().day > CLOSED_MONTH_SETTLE_DAYS,
+                "fields": {key: getattr(energy_response_dict, key) for key in CLOSED_MONTH_FIELDS},
+            }
+
+        _LOGGER.debug("에너지 사용량 : %s", energy_response_dict)
+        return energy_response_dict
+
+    async def get_monthly_history(self, months):
+        """월별 사용량 이력 조회 (0100 유형만 지원)
+
+        정기 조회와 같은 경로(_poll)로 유지된 연결이 끊어진 경우 재연결하고, 재시도와 circuit breaker 를 적용한다.
+        재시도할 때는 이미 조회된 달은 다시 요청하지 않는다.
+
+        months : 조회할 년월 목록 (YYYYMM)
+        반환값 : {년월: {유틸리티: 사용량}}, 서버가 최소 개월 수 요청도 처리하지 못하면 그때까지 조회된 결과
+        연결/응답 오류는 KocomEnergyError 발생
+        """
+        history = {}
+        self.breaker.acquire()
+        return await self._guarded(lambda reused: self._query_history_months(months, history, reused))
+
+    async def _query_history_months(self, months, history, reused):
+        """필요하면 연결/인증 후 history 에 없는 달을 history_batch_size 개월씩 조회해 채움"""
+        if not reused:
+            await self._connect()
+
+        if self.metadata is None:
+            self.metadata = await self._query_metadata()
+
+        if self.metadata["disp_type"] != "0100":
+            _LOGGER.error(f"월별 이력 조회를 지원하지 않는 에너지 조회 유형: {self.metadata['disp_type']}")
+            return history
+
+        months = [month for month in months if month not in history]
+        index = 0
+        while index < len(months):
+            batch = months[index : index + self.history_batch_size]
+            result = await self._query_history(batch)
+
+            if result is None:
+                # 서버가 처리하지 못한 경우 요청 개월 수를 줄여서 재시도
+                if self.history_batch_size <= HISTORY_MIN_MONTHS_PER_REQUEST:
+                    return history
+                self.history_batch_size = max(HISTORY_MIN_MONTHS_PER_REQUEST, self.history_batch_size // 2)
+                _LOGGER.debug(f"월별 이력 요청 개월 수 축소: {self.history_batch_size}")
+                continue
+
+            history.update(result)
+            index += len(batch)
+
+        return history
+
+    async def _query_history(self, months):
+        """월별 사용량 요청 한 건. 서버 오류나 해석 실패 시 None"""
+        household = (self.metadata["town"], self.metadata["dong"], self.metadata["ho"])
+        with self.metrics.phase("history"):
+            self._write(self.encoder.energy_type_1(household, months))
+            await self._writer.drain()
+            energy_response = await asyncio.wait_for(self._read(), timeout=10.0)
+
+        if energy_response.startswith(ERROR_RESPONSE_PREFIX):
+            _LOGGER.debug(f"월별 이력 요청 오류 응답: {energy_response[:5].hex()}")
+            self.metrics.failure("history", "ServerResponseError")
+            return None
 
+        try:
+            return decode_history(energy_response, len(months))
+        except struct.error:
+            _LOGGER.debug(f"월별 이력 응답 길이 부족: {len(energy_response)}")
+            self.metrics.failure("history", "ServerResponseError")
+            return None
+
+    async def _query_metadata(self):
+        """메뉴/주소 조회로 세대 정보(에너지 조회 유형, 타운/동/호) 확인"""
+
+        with self.metrics.phase("menu"):
+            # 메뉴 정보 조회 패킷 전송
+            self._write(self.encoder.menu)
+            await self._writer.drain()
+
+            # 메뉴 정보 조회 응답 대기 (10초 timeout 설정)
+            menu_response = await asyncio.wait_for(self._read(), timeout=10.0)
+
+        with self.metrics.phase("addr"):
+            # 주소 조회 패킷 전송
+            self._write(self.encoder.addr)
+            await self._writer.drain()
+
+            # 주소 조회 응답 대기 (10초 timeout 설정)
+            addr_response = await asyncio.wait_for(self._read(), timeout=10.0)
+
+        return self._parse_metadata(menu_response, addr_response)
+
+    def _parse_metadata(self, menu_response, addr_response):
+        """메뉴/주소 응답에서 세대 정보 추출. 주소 응답이 짧으면 ServerResponseError 발생"""
+        menu_response = menu_response.hex()
+        _LOGGER.debug('메뉴 정보 응답 패킷: %s', menu_response)
+        _LOGGER.debug('에너지 조회 유형 : %s', menu_response[96:100])
+
+
+        """# 에너지 조회 유형 세팅 (energyInfo.class)
+
+        0100 인 경우
+        |항목|전전달|지난달|이번달|
+        |---|----|-----|----|
+        전기    -
+        가스    -
+        수도    -
+        온수    -
+        난방    -
+
+        0200 인 경우 아직 미식별됨 (항목을 제외한 열이 4개)
+
+        0300 1, 2 두가지 유형이 있으나 1번만 처리
+        |항목|사용량|증감|
+        |---|----|---|
+        전기    -
+        수도    -
+        온수    -
+        가스    -
+        난방    -
+
+        """
+        disp_type = menu_response[96:100]
+
+        addr_response = addr_response.hex()
+        _LOGGER.debug('주소 응답 패킷: %s', addr_response)
+        _LOGGER.debug('타운: %s', addr_response[24:28])
+        _LOGGER.debug('동: %s', addr_response[32:36])
+        _LOGGER.debug('호: %s', addr_response[40:44])
+
+        if len(addr_response) < 44:
+            raise ServerResponseError(f"비정상 주소 응답 수신. 응답 길이: {len(addr_response) // 2}")
+
+        return {
+            "disp_type": disp_type,
+            "town": addr_response[24:28],
+            "dong": addr_response[32:36],
+            "ho": addr_response[40:44],
+        }
@@ -0,0 +1,91 @@
+import mmap
+import os
+import struct
+import time
+
+
+# 패킷 방향
+CAPTURE_TX = 1
+CAPTURE_RX = 2
+
+# 파일 헤더 : magic, version, slot 크기, slot 개수, 다음 기록 위치, 기록된 slot 수
+FILE_MAGIC = b"KCAP"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sHxxIIQQ")
+
+# slot 헤더 : 기록 시각(epoch), 방향, 원래 패킷 길이, slot 에 저장된 길이
+SLOT_HEADER = struct.Struct("<dBxxxII")
+
+DEFAULT_SLOT_SIZE = 2048
+DEFAULT_SLOTS = 512
+
+
+class PacketCapture:
+    """요청/응답 패킷을 고정 크기 slot 의 ring buffer 로 파일에 기록 (mmap)
+
+    기록은 slot 하나에 대한 메모리 복사뿐이며 파일 크기는 slot 크기 x slot 개수로 고정된다.
+    slot 보다 큰 패킷은 잘라서 저장하고 원래 길이를 함께 기록한다.
+    """
+
+    def __init__(self, path, slot_size=DEFAULT_SLOT_SIZE, slots=DEFAULT_SLOTS):
+        self.path = path
+        self.slot_size = slot_size
+        self.slots = slots
+        size = FILE_HEADER.size + slot_size * slots
+
+        # 설정이 다른 기존 파일은 새로 초기화
+        reuse = False
+        if os.path.exists(path) and os.path.getsize(path) == size:
+            with open(path, "rb") as f:
+                magic, version, old_slot_size, old_slots, _, _ = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+            reuse = (magic, version, old_slot_size, old_slots) == (FILE_MAGIC, FILE_VERSION, slot_size, slots)
+
+        self._file = open(path, "r+b" if reuse else "w+b")
+        if not reuse:
+            self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+
+        if reuse:
+            _, _, _, _, self._next, self._count = FILE_HEADER.unpack_from(self._mmap, 0)
+        else:
+            self._next = 0
+            self._count = 0
+            self._write_header()
+
+    def _write_header(self):
+        FILE_HEADER.pack_into(self._mmap, 0, FILE_MAGIC, FILE_VERSION, self.slot_size, self.slots, self._next, self._count)
+
+    def record(self, direction, data):
+        """패킷 한 건 기록"""
+        stored = min(len(data), self.slot_size - SLOT_HEADER.size)
+        offset = FILE_HEADER.size + self._next * self.slot_size
+        SLOT_HEADER.pack_into(self._mmap, offset, time.time(), direction, len(data), stored)
+        start = offset + SLOT_HEADER.size
+        self._mmap[start : start + stored] = data[:stored]
+
+        self._next = (self._next + 1) % self.slots
+        self._count = min(self._count + 1, self.slots)
+        self._write_header()
+
+    def close(self):
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+
+
+def read_capture(path):
+    """캡처 파일의 패킷을 오래된 순서로 (시각, 방향, 원래 길이, 데이터) 반환"""
+    with open(path, "rb") as f:
+        buffer = f.read()
+
+    magic, version, slot_size, slots, next_slot, count = FILE_HEADER.unpack_from(buffer, 0)
+    if magic != FILE_MAGIC or version != FILE_VERSION:
+        raise ValueError(f"캡처 파일 형식이 아닙니다: {path}")
+
+    view = memoryview(buffer)
+    for index in range(count):
+        slot = (next_slot - count + index) % slots
+        offset = FILE_HEADER.size + slot * slot_size
+        timestamp, direction, length, stored = SLOT_HEADER.unpack_from(view, offset)
+        start = offset + SLOT_HEADER.size
+        yield timestamp, direction, length, bytes(view[start : start + stored])
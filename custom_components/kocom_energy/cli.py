@@ -0,0 +1,171 @@
+"""코콤 에너지 사용량 일괄 조회 (Home Assistant 없이 실행)
+
+계정 목록을 읽어 여러 세대를 동시에 조회하고, 조회가 끝나는 대로 한 줄씩 CSV 또는 NDJSON 으로 출력한다.
+
+    python -m custom_components.kocom_energy.cli accounts.csv --workers 32 --format ndjson -o usage.ndjson
+
+계정 목록은 username, password 열(필요하면 ip 열)을 가진 CSV 또는 한 줄에 JSON 객체 하나인 NDJSON.
+ip 가 없으면 SvrInfo.php 로 단지 서버 IP 를 조회하며, 같은 아이디가 여러 번 나오면 결과를 재사용한다.
+"""
+import argparse
+import asyncio
+import csv
+import datetime
+import json
+import logging
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+from .api import API
+from .const import DISCOVERY_URL, FLEET_MAX_PER_SERVER, FLEET_RATE_PER_SERVER, FLEET_BURST_PER_SERVER
+from .decoder import FIELDS
+from .exceptions import KocomEnergyError, IpAddressNotFoundError
+from .fleet import FleetScheduler
+from .protocol import credential_fields
+from .util import parse_server_ip
+
+
+# CSV 열 : 계정 정보, 결과, 조회 유형별 년월/사용량 키
+COLUMNS = ["username", "ip", "fetched", "error", *FIELDS]
+
+
+def read_accounts(path):
+    """계정 목록을 한 줄씩 읽기 (.ndjson/.jsonl 은 JSON, 그 외는 CSV, '-' 는 표준 입력 CSV)"""
+    stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if path.endswith((".ndjson", ".jsonl")):
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(stream)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class Discovery:
+    """SvrInfo.php 조회 (아이디별로 한 번만 조회)"""
+
+    def __init__(self, url):
+        self.url = url
+        self._pending = {}
+
+    def _fetch(self, username):
+        with urllib.request.urlopen(f"{self.url}?{urllib.parse.urlencode({'uid': username})}", timeout=10) as resp:
+            return parse_server_ip(resp.read().decode("utf-8", "replace"))
+
+    async def resolve(self, username):
+        task = self._pending.get(username)
+        if task is None:
+            task = self._pending[username] = asyncio.ensure_future(asyncio.to_thread(self._fetch, username))
+        return await task
+
+
+class Writer:
+    """조회 결과를 받는 대로 한 줄씩 출력"""
+
+    def __init__(self, stream, output_format):
+        self.stream = stream
+        self.format = output_format
+        if output_format == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=COLUMNS, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self, row):
+        if self.format == "csv":
+            self._csv.writerow(row)
+        else:
+            self.stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+async def poll_account(account, scheduler, discovery, port, pipelining=False):
+    """계정 하나 조회 후 출력할 행 반환 (실패 시 error 열에 오류 유형과 내용)"""
+    username = account["username"]
+    row = {"username": username, "ip": account.get("ip") or None}
+    api = None
+    try:
+        if not row["ip"]:
+            row["ip"] = await discovery.resolve(username)
+
+        api = API(
+            ip=row["ip"],
+            **credential_fields(username, account["password"]),
+            keepalive_interval=0,
+            scheduler=scheduler,
+            pipelining=pipelining,
+        )
+        api.port = port
+        row.update((await api.get_energy_data()).as_dict())
+        row["fetched"] = datetime.datetime.now().isoformat(timespec="seconds")
+    except (KocomEnergyError, IpAddressNotFoundError, OSError) as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if api is not None:
+            await api.close()
+    return row
+
+
+async def run(args):
+    scheduler = FleetScheduler(
+        max_concurrency=args.workers,
+        max_per_server=args.per_server,
+        rate_per_server=args.rate_per_server,
+        burst_per_server=max(args.per_server, FLEET_BURST_PER_SERVER),
+    )
+    discovery = Discovery(args.discovery_url)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    writer = Writer(output, args.format)
+    accounts = read_accounts(args.accounts)
+    counts = {"ok": 0, "failed": 0}
+    start = time.perf_counter()
+
+    async def worker():
+        # 계정 목록도 필요한 만큼만 읽음
+        for account in accounts:
+            row = await poll_account(account, scheduler, discovery, args.port, args.pipelining)
+            counts["failed" if row.get("error") else "ok"] += 1
+            writer.write(row)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(args.workers)))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    total = counts["ok"] + counts["failed"]
+    print(
+        f"{total} accounts, {counts['ok']} ok, {counts['failed']} failed, "
+        f"{elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f}/s)",
+        file=sys.stderr,
+    )
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("accounts", help="계정 목록 (CSV 또는 NDJSON, '-' 는 표준 입력)")
+    parser.add_argument("-o", "--output", default="-", help="출력 파일 (기본 표준 출력)")
+    parser.add_argument("-f", "--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("-w", "--workers", type=int, default=16, help="동시에 조회할 세대 수")
+    parser.add_argument("--per-server", type=int, default=FLEET_MAX_PER_SERVER, help="단지 서버별 동시 연결 수")
+    parser.add_argument("--rate-per-server", type=float, default=FLEET_RATE_PER_SERVER, help="단지 서버별 초당 요청 수")
+    parser.add_argument("--discovery-url", default=DISCOVERY_URL)
+    parser.add_argument("--port", type=int, default=15000, help="단지 서버 포트")
+    parser.add_argument("--pipelining", action="store_true", help="인증/에너지 요청을 이어서 전송 (지원하지 않는 서버는 순차 요청)")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    args = parser.parse_args(argv)
+
+    # 조회 실패는 결과의 error 열로 확인하므로 기본적으로 로그는 출력하지 않음
+    logging.basicConfig(level=(logging.CRITICAL, logging.INFO, logging.DEBUG)[min(args.verbose, 2)])
+
+    counts = asyncio.run(run(args))
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
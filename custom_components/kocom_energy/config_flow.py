@@ -1,14 +1,12 @@
 import voluptuous as vol
 import logging
-import aiohttp
-import async_timeout
 import asyncio
-import re
 from homeassistant import config_entries
-from .const import DOMAIN, PLATFORMS
+from .const import DOMAIN, PLATFORMS, DEFAULT_MAX_INTERVAL
 from .exceptions import IpAddressNotFoundError
-from .api import API
-from .util import string_to_padded_hex, md5_hashing, hex_to_ascii
+
+# 설정 화면에서만 쓰는 모듈(API, 서버 IP 조회, aiohttp)은 단계 실행 시 불러옴
+# (HA 시작 시 config_flow 를 불러오는 비용 최소화, tools/bench_import.py 로 확인)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,37 +17,30 @@ class KocomEnergyConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
     
         if user_input is not None:
+            import aiohttp
+            from .discovery import get_discovery
+
             try:
                 # http 요청으로 IP 얻기
-                async with aiohttp.ClientSession() as session, \
-                        async_timeout.timeout(10):
-                    resp = await session.get(f"http://221.141.3.28/SvrInfo.php?uid={user_input['username']}")
-                    resp.raise_for_status()
-                    response_text = await resp.text()
-
-                    # IP 주소 추출
-                    ip_address_match = re.search(r'3 => ([\d\.]+)', response_text)
-                    if not ip_address_match:
-                        raise IpAddressNotFoundError("IP address not found in the response")
-                    ip_address = ip_address_match.group(1)
-                    
-                    # IP 얻기 성공 -> account step으로 이동
-                    return self.async_show_form(
-                        step_id="account",
-                        data_schema=vol.Schema({
-                            vol.Required("ip", default=ip_address): str,
-                            vol.Required("username", default=user_input["username"]): str,
-                            vol.Required("password"): str,
-                            # vol.Optional("phone"): str,
-                            vol.Required("update_interval", default=3600): vol.In({
-                                # 60    : "1분",
-                                # 180   : "3분",
-                                300   : "5분",
-                                3600  : "1시간",
-                                86400 : "일"
-                            })
+                ip_address = await get_discovery(self.hass).async_discover(user_input["username"])
+
+                # IP 얻기 성공 -> account step으로 이동
+                return self.async_show_form(
+                    step_id="account",
+                    data_schema=vol.Schema({
+                        vol.Required("ip", default=ip_address): str,
+                        vol.Required("username", default=user_input["username"]): str,
+                        vol.Required("password"): str,
+                        # vol.Optional("phone"): str,
+                        vol.Required("update_interval", default=3600): vol.In({
+                            # 60    : "1분",
+                            # 180   : "3분",
+                            300   : "5분",
+                            3600  : "1시간",
+                            86400 : "일"
                         })
-                    )
+                    })
+                )
 
             except aiohttp.ClientError:
                 _LOGGER.error("서버 접속 실패")
@@ -78,13 +69,14 @@ class KocomEnergyConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
 
         if user_input is not None:
+            from .api import API
+            from .protocol import credential_fields
+
             _LOGGER.debug(f"user_input 정보 : {user_input}")
             transformed_input = {
                 "ip"          : user_input["ip"],
-                "username"    : string_to_padded_hex(md5_hashing(user_input["username"]), 80),      # md5 해싱 후 hex 변환
-                "password"    : string_to_padded_hex(md5_hashing(user_input["password"]), 80),      # md5 해싱 후 hex 변환
-                "fcm"         : string_to_padded_hex('', 512),                                      # 모바일 환경의 경우 fcm 값 전달함
-                "phone"       : string_to_padded_hex('', 32),                                       # 전화번호 필수 값 아님
+                # 아이디/비밀번호 md5 해싱 후 hex 변환, fcm(모바일 환경의 경우 전달)과 전화번호는 빈 값
+                **credential_fields(user_input["username"], user_input["password"]),
             }
             
             # 인증 확인
@@ -146,15 +138,17 @@ class KocomEnergyOptionsFlow(config_entries.OptionsFlow):
         """옵션 설정 폼 표시"""
         errors = {}
 
-        if user_input is not None:
+        if user_input is not None and user_input["min_interval"] > user_input["max_interval"]:
+            errors["base"] = "invalid_interval"
+        elif user_input is not None:
+            from .api import API
+            from .protocol import credential_fields
+
             try:
                 # 인증 확인
                 transformed_input = {
                     "ip": self._config_entry.data["ip"],  # self.config_entry 대신 self._config_entry 사용
-                    "username": string_to_padded_hex(md5_hashing(user_input["username"]), 80),
-                    "password": string_to_padded_hex(md5_hashing(user_input["password"]), 80),
-                    "fcm": string_to_padded_hex('', 512),
-                    "phone": string_to_padded_hex('', 32),
+                    **credential_fields(user_input["username"], user_input["password"]),
                 }
                 
                 api = API(**transformed_input)
@@ -170,10 +164,17 @@ class KocomEnergyOptionsFlow(config_entries.OptionsFlow):
                             "original_username": user_input["username"]
                         }
                     )
-                    # options로 update_interval 반환
+                    # options로 update_interval 및 적응형 폴링 설정 반환
                     return self.async_create_entry(
                         title="",
-                        data={"update_interval": user_input["update_interval"]}
+                        data={
+                            "update_interval": user_input["update_interval"],
+                            "adaptive_polling": user_input["adaptive_polling"],
+                            "min_interval": user_input["min_interval"],
+                            "max_interval": user_input["max_interval"],
+                            "packet_capture": user_input["packet_capture"],
+                            "pipelining": user_input["pipelining"],
+                        }
                     )
                 else:
                     errors["base"] = "auth_error"
@@ -184,6 +185,7 @@ class KocomEnergyOptionsFlow(config_entries.OptionsFlow):
         # 기본값 설정
         default_username = self._config_entry.data.get("original_username", "")  # self.config_entry 대신 self._config_entry 사용
         default_interval = self._config_entry.data.get("update_interval", 3600)  # self.config_entry 대신 self._config_entry 사용
+        options = self._config_entry.options
 
         return self.async_show_form(
             step_id="init",
@@ -194,7 +196,15 @@ class KocomEnergyOptionsFlow(config_entries.OptionsFlow):
                     300: "5분",
                     3600: "1시간",
                     86400: "일"
-                })
+                }),
+                # 적응형 폴링 (서버 갱신 주기 학습, 최소/최대 간격 초 단위, 최소 간격 기본값은 갱신 주기)
+                vol.Required("adaptive_polling", default=options.get("adaptive_polling", False)): bool,
+                vol.Required("min_interval", default=options.get("min_interval", default_interval)): vol.All(vol.Coerce(int), vol.Range(min=30)),
+                vol.Required("max_interval", default=options.get("max_interval", DEFAULT_MAX_INTERVAL)): vol.All(vol.Coerce(int), vol.Range(min=30)),
+                # 디버깅용 패킷 캡처
+                vol.Required("packet_capture", default=options.get("packet_capture", False)): bool,
+                # 요청을 이어서 전송 (서버 응답 지연이 큰 경우, 지원하지 않는 서버는 자동으로 순차 요청)
+                vol.Required("pipelining", default=options.get("pipelining", False)): bool,
             }),
             errors=errors
         )
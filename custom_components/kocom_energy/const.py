@@ -1,3 +1,67 @@
 DOMAIN = "kocom_energy"
 PLATFORMS = ["sensor"]
-DEVICE_ID = "kocom_energy_device"
\ No newline at end of file
+DEVICE_ID = "kocom_energy_device"
+
+# 인증된 연결 유지를 위한 keepalive 전송 주기 (초)
+KEEPALIVE_INTERVAL = 60
+# 갱신 주기가 이 값(초) 이하일 때만 폴링 간 연결 유지 (더 길면 폴링마다 연결 후 종료하고 keepalive 를 보내지 않음)
+SESSION_MAX_INTERVAL = 300
+
+# HA storage 저장 버전 및 지연 저장 시간 (초)
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+
+# 여러 config entry 폴링 조율 (전체 동시 폴링 수, 서버별 동시 연결 수, 서버별 초당 요청 수 및 최대 누적)
+FLEET_MAX_CONCURRENCY = 16
+FLEET_MAX_PER_SERVER = 4
+FLEET_RATE_PER_SERVER = 2.0
+FLEET_BURST_PER_SERVER = 4
+
+# 월별 이력 조회 시 요청 한 건에 담을 최대/최소 개월 수 (최소값은 정기 조회와 동일한 3개월)
+HISTORY_MAX_MONTHS_PER_REQUEST = 12
+HISTORY_MIN_MONTHS_PER_REQUEST = 3
+
+# 유틸리티별 장기 통계 단위
+UTILITY_UNITS = {
+    "electricity": "kWh",
+    "gas": "m³",
+    "water": "m³",
+    "hot_water": None,
+    "heating": None,
+}
+
+# 월별 이력 가져오기 기본 개월 수
+DEFAULT_BACKFILL_MONTHS = 12
+
+# 적응형 폴링 (기본 최대 간격, 값 변화 없을 때 증가 배율, 예상 갱신 후 여유 시간, 월 경계 전후 빠른 폴링 구간)
+# 최소 간격 기본값은 config entry 의 갱신 주기
+DEFAULT_MAX_INTERVAL = 86400
+ADAPTIVE_BACKOFF = 1.5
+ADAPTIVE_GRACE = 30
+ADAPTIVE_MONTH_WINDOW = 3600
+# 서버 갱신 주기 학습에 사용할 최근 표본 수 및 최소 표본 수
+ADAPTIVE_HISTORY = 16
+ADAPTIVE_MIN_SAMPLES = 3
+
+# 조회 실패 시 한 번의 폴링 안에서 재시도 횟수 및 지수 backoff (초, jitter 적용)
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0
+RETRY_BACKOFF_MAX = 10.0
+
+# 서버별 circuit breaker (연속 실패 횟수, 차단 유지 시간 초기값/최대값 초)
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 60
+BREAKER_RESET_TIMEOUT_MAX = 1800
+
+# 단지 서버 IP 조회 (SvrInfo.php), 재조회를 시작할 연속 연결 실패 횟수
+DISCOVERY_URL = "http://221.141.3.28/SvrInfo.php"
+DISCOVERY_FAILURE_THRESHOLD = 3
+
+# 프로파일링 서비스 기본 측정 시간 (초)
+DEFAULT_PROFILE_SECONDS = 60
+
+# 같은 세대 entry 간 조회 공유 : 이 시간(초) 안에 조회된 결과는 다시 조회하지 않고 공유
+HOUSEHOLD_SHARE_WINDOW = 60
+
+# 0100 유형 마감 월 캐시 : 월이 바뀐 뒤 지난달 값이 확정될 때까지(일) 매번 세 달 전체 조회
+CLOSED_MONTH_SETTLE_DAYS = 1
@@ -0,0 +1,166 @@
+import struct
+from functools import lru_cache
+
+
+# 유틸리티 항목
+ELECTRICITY = "electricity"
+GAS = "gas"
+WATER = "water"
+HOT_WATER = "hot_water"
+HEATING = "heating"
+
+
+class EnergyLayout:
+    """에너지 응답 패킷 레이아웃 (조회 유형별)
+
+    응답 본문은 (조회 월 x 유틸리티) 개의 고정 길이 레코드가 연속으로 배치되어 있으며
+    레코드마다 조회 년월 문자열과 little-endian double 사용량이 들어있다.
+    전체 레코드를 하나의 struct 로 미리 컴파일해 두고 unpack_from 한 번으로 해석한다.
+    """
+
+    def __init__(self, offset, stride, ym_offset, ym_size, usage_offset, utilities, periods):
+        self.offset = offset
+        self.stride = stride
+        self.utilities = utilities
+        self.periods = periods
+
+        # 레코드 내 필요한 필드만 읽고 나머지는 pad byte(x)로 건너뜀
+        record = f"{ym_offset}x{ym_size}s{usage_offset - ym_offset - ym_size}xd"
+        record_size = usage_offset + 8
+        gap = f"{stride - record_size}x" if stride > record_size else ""
+        count = len(utilities) * len(periods)
+        self.struct = struct.Struct("<" + record + (gap + record) * (count - 1))
+
+        # unpack 결과 순서대로 (년월 키, 사용량 키)
+        self.keys = []
+        for period in periods:
+            for index, utility in enumerate(utilities):
+                # 조회 년월은 월별 첫 번째 레코드(전기)의 값만 사용
+                self.keys.append((period if index == 0 else None, f"{utility}_usage_{period}"))
+
+    @property
+    def size(self):
+        """해석에 필요한 최소 응답 길이 (bytes)"""
+        return self.offset + self.struct.size
+
+
+"""# 에너지 조회 유형 (energyInfo.class)
+
+0100 인 경우 : 전전달, 지난달, 이번달 x 전기, 가스, 수도, 온수, 난방 (레코드 28 bytes)
+0300 인 경우 : 이번달 x 전기, 수도, 온수, 가스, 난방 (레코드 44 bytes)
+"""
+_TYPE_1 = dict(
+    offset=32, stride=28, ym_offset=4, ym_size=8, usage_offset=20,
+    utilities=(ELECTRICITY, GAS, WATER, HOT_WATER, HEATING),
+)
+
+LAYOUTS = {
+    "0100": EnergyLayout(**_TYPE_1, periods=("two_months_ago", "last_month", "this_month")),
+    "0300": EnergyLayout(
+        offset=92, stride=44, ym_offset=4, ym_size=7, usage_offset=24,
+        utilities=(ELECTRICITY, WATER, HOT_WATER, GAS, HEATING),
+        periods=("this_month",),
+    ),
+}
+
+
+# 0100 유형에서 이번달만 조회한 응답 (마감된 지난 두 달은 캐시 사용)
+CURRENT_MONTH_LAYOUT = EnergyLayout(**_TYPE_1, periods=("this_month",))
+
+# 전체 조회 유형의 년월/사용량 키 (EnergySnapshot 속성)
+FIELDS = tuple(dict.fromkeys(key for layout in LAYOUTS.values() for pair in layout.keys for key in pair if key))
+
+# 0100 유형의 마감된 달(전전달, 지난달) 년월/사용량 키
+CLOSED_MONTH_FIELDS = tuple(
+    key for pair in LAYOUTS["0100"].keys for key in pair if key and not key.endswith("this_month")
+)
+
+
+class EnergySnapshot:
+    """에너지 조회 결과
+
+    속성은 FIELDS 의 년월 키(this_month 등)와 사용량 키(electricity_usage_this_month 등)이며
+    조회 유형에 없는 항목은 None. 폴링마다 만드는 dict 대신 __slots__ 객체로 보관하고
+    센서는 속성을 바로 읽는다. 저장/출력에는 as_dict() 를 사용한다.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, **values):
+        for name in FIELDS:
+            setattr(self, name, values.get(name))
+
+    @classmethod
+    def from_dict(cls, data):
+        """as_dict() 결과(저장된 스냅샷)로 생성 (알 수 없는 키는 무시)"""
+        return cls(**{name: data[name] for name in FIELDS if name in data})
+
+    def as_dict(self):
+        """조회된 항목만 담은 dict (이전 응답 dict 와 같은 형식)"""
+        result = {}
+        for name in FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = value
+        return result
+
+    def __repr__(self):
+        return f"EnergySnapshot({self.as_dict()})"
+
+
+# 조회 유형별로 응답에 없는 항목 (decode_energy 에서 None 으로 채움)
+_MISSING = {
+    disp_type: tuple(name for name in FIELDS if all(name not in pair for pair in layout.keys))
+    for disp_type, layout in LAYOUTS.items()
+}
+_new_snapshot = object.__new__
+
+
+def decode_energy(disp_type, data):
+    """에너지 응답 패킷(bytes)을 조회 유형 레이아웃에 따라 한 번에 해석해 EnergySnapshot 반환
+
+    지원하지 않는 유형이면 KeyError, 응답 길이가 부족하면 struct.error 발생
+    """
+    snapshot = _new_snapshot(EnergySnapshot)
+    for name in _MISSING[disp_type]:
+        setattr(snapshot, name, None)
+    return _decode_into(snapshot, LAYOUTS[disp_type], data)
+
+
+def decode_current_month(data, closed):
+    """0100 유형에서 이번달만 조회한 응답을 해석해 캐시된 마감 월 값(closed : CLOSED_MONTH_FIELDS dict)과 합친 EnergySnapshot 반환
+
+    응답 길이가 부족하면 struct.error 발생
+    """
+    return _decode_into(EnergySnapshot(**closed), CURRENT_MONTH_LAYOUT, data)
+
+
+def _decode_into(snapshot, layout, data):
+    values = layout.struct.unpack_from(memoryview(data), layout.offset)
+    for (ym_key, usage_key), ym, usage in zip(layout.keys, values[0::2], values[1::2]):
+        if ym_key is not None:
+            setattr(snapshot, ym_key, ym.decode("ascii").rstrip("\x00"))
+        setattr(snapshot, usage_key, usage)
+    return snapshot
+
+
+@lru_cache(maxsize=None)
+def _history_layout(count):
+    """0100 유형에서 count 개월을 조회한 응답 레이아웃"""
+    return EnergyLayout(**_TYPE_1, periods=tuple(range(count)))
+
+
+def decode_history(data, count):
+    """0100 유형 월별 조회 응답을 {년월: {유틸리티: 사용량}} 으로 해석
+
+    응답 길이가 count 개월보다 부족하면 struct.error 발생
+    """
+    layout = _history_layout(count)
+    values = layout.struct.unpack_from(memoryview(data), layout.offset)
+    width = len(layout.utilities) * 2
+
+    history = {}
+    for index in range(0, len(values), width):
+        ym = values[index].decode("ascii").rstrip("\x00")
+        history[ym] = dict(zip(layout.utilities, values[index + 1 : index + width : 2]))
+    return history
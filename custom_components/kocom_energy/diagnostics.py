@@ -0,0 +1,64 @@
+from homeassistant.components.diagnostics import async_redact_data
+
+from .const import DOMAIN
+
+
+# 인증 정보, 단지 서버 IP, 세대 위치(타운/동/호)는 진단 정보에서 제외
+TO_REDACT = {"username", "password", "fcm", "phone", "original_username", "ip", "town", "dong", "ho"}
+
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    """config entry 진단 정보 (요청 단계별 지연 시간/실패/송수신량, 세션 및 폴링 상태, 마지막 조회 데이터)"""
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    api = data.get("api")
+    coordinator = data.get("coordinator")
+    households = hass.data.get(DOMAIN, {}).get("households")
+
+    diagnostics = {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+    }
+
+    if api is not None:
+        diagnostics["api"] = {
+            "ip": api.ip,
+            "connected": api.connected,
+            "metadata": api.metadata,
+            # 마감 월 캐시는 사용량 대신 상태만 요약
+            "closed_months": {
+                "month": api.closed_months["month"],
+                "this_month": api.closed_months["this_month"],
+                "settled": api.closed_months["settled"],
+            } if api.closed_months is not None else None,
+            "current_month_only": api.current_month_only,
+            "history_batch_size": api.history_batch_size,
+            "pipelining": {
+                "enabled": api.pipelining,
+                "supported": api.pipelining_supported,
+            },
+            "breaker": {
+                "state": api.breaker.state,
+                "failures": api.breaker.failures,
+            },
+            "metrics": api.metrics.as_dict(),
+        }
+
+        household = households.household(api) if households is not None else None
+        if household is not None:
+            # 같은 세대를 조회하는 설정 수, 이 설정이 대표로 조회하는지 여부
+            diagnostics["api"]["household"] = {
+                "entries": len(household.members),
+                "leader": household.leader is api,
+            }
+
+    if coordinator is not None:
+        diagnostics["coordinator"] = {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+            # energy 센서 속성은 recorder 에 기록하지 않으므로 전체 조회 데이터는 여기서 확인
+            "data": coordinator.data.as_dict() if coordinator.data is not None else None,
+        }
+
+    return async_redact_data(diagnostics, TO_REDACT)
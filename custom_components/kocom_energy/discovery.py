@@ -0,0 +1,53 @@
+import asyncio
+import logging
+
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DOMAIN, DISCOVERY_URL
+from .util import parse_server_ip
+
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_fetch_server_ip(session, username, url=DISCOVERY_URL):
+    """http 요청으로 단지 서버 IP 조회"""
+    async with asyncio.timeout(10):
+        resp = await session.get(url, params={"uid": username})
+        resp.raise_for_status()
+        return parse_server_ip(await resp.text())
+
+
+class ServerDiscovery:
+    """단지 서버 IP 조회
+
+    - 같은 아이디에 대한 동시 조회는 하나로 합침 (조회 결과는 따로 기록하지 않음)
+    - config entry 는 설정 시 인증을 확인한 IP 를 사용하고, 연결 실패가 반복될 때만 새로 조회
+    - 새로 조회한 IP 는 인증까지 성공한 경우에만 config entry 의 "ip" 로 저장 (sensor.py)
+    """
+
+    def __init__(self, hass, url=DISCOVERY_URL):
+        self.hass = hass
+        self.url = url
+        self._pending = {}
+
+    async def async_discover(self, username):
+        """서버 IP 를 새로 조회해 반환
+
+        조회 실패 시 aiohttp.ClientError, asyncio.TimeoutError, IpAddressNotFoundError 발생
+        """
+        task = self._pending.get(username)
+        if task is None:
+            task = self._pending[username] = self.hass.async_create_background_task(
+                async_fetch_server_ip(async_get_clientsession(self.hass), username, self.url),
+                f"{DOMAIN} discovery {username}",
+            )
+            task.add_done_callback(lambda _: self._pending.pop(username, None))
+        return await asyncio.shield(task)
+
+
+def get_discovery(hass):
+    """모든 config entry 와 설정 화면이 공유하는 ServerDiscovery"""
+    hass.data.setdefault(DOMAIN, {})
+    if "discovery" not in hass.data[DOMAIN]:
+        hass.data[DOMAIN]["discovery"] = ServerDiscovery(hass)
+    return hass.data[DOMAIN]["discovery"]
@@ -2,6 +2,34 @@ class IpAddressNotFoundError(Exception):
     """Exception raised for errors in the input IP address."""
     pass
 
-class AuthenticationError(Exception):
+class KocomEnergyError(Exception):
+    """Base exception for failed requests to the Kocom server."""
+    pass
+
+class AuthenticationError(KocomEnergyError):
     """Exception raised for authentication failures."""
     pass
+
+class ProtocolError(KocomEnergyError):
+    """Exception raised for malformed protocol frames."""
+    pass
+
+class PipeliningUnsupportedError(ProtocolError):
+    """Exception raised when a server does not answer requests sent back-to-back."""
+    pass
+
+class ConnectionFailedError(KocomEnergyError):
+    """Exception raised when the server cannot be reached or drops the connection."""
+    pass
+
+class ResponseTimeoutError(KocomEnergyError):
+    """Exception raised when the server does not answer in time."""
+    pass
+
+class ServerResponseError(KocomEnergyError):
+    """Exception raised for error responses or responses that cannot be decoded."""
+    pass
+
+class CircuitOpenError(KocomEnergyError):
+    """Exception raised when polls to a server are short-circuited after repeated failures."""
+    pass
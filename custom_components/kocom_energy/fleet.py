@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from .exceptions import CircuitOpenError
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT_MAX,
+    FLEET_MAX_CONCURRENCY,
+    FLEET_MAX_PER_SERVER,
+    FLEET_RATE_PER_SERVER,
+    FLEET_BURST_PER_SERVER,
+)
+
+
+_LOGGER = logging.getLogger(__name__)
+
+class TokenBucket:
+    """서버별 요청 속도 제한 (초당 rate 개, 최대 burst 개까지 누적)"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """서버별 circuit breaker
+
+    연속 실패가 threshold 에 도달하면 차단(open)하고, 차단 시간이 지나면 요청 하나만
+    시험(half-open)으로 통과시킨다. 시험이 성공하면 복구, 실패하면 차단 시간을 늘려 다시 차단한다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT, reset_timeout_max=BREAKER_RESET_TIMEOUT_MAX):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.reset_timeout_max = reset_timeout_max
+        self.state = self.CLOSED
+        self.failures = 0
+        self._timeout = reset_timeout
+        self._opened_at = 0.0
+        self._probing = False
+
+    def acquire(self):
+        """요청 가능 여부 확인. 차단 중이면 CircuitOpenError 발생"""
+        if self.state == self.CLOSED:
+            return
+
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self._timeout:
+            self.state = self.HALF_OPEN
+
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+
+        raise CircuitOpenError(f"서버 응답 없음, {self._timeout}초 동안 조회 중단")
+
+    def success(self):
+        """서버가 응답함 (인증/응답 오류 포함)"""
+        if self.state != self.CLOSED:
+            _LOGGER.info("서버 응답 복구, 조회 재개")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._timeout = self.reset_timeout
+        self._probing = False
+
+    def failure(self):
+        """연결 실패 또는 응답 시간 초과"""
+        self.failures += 1
+        if self.state == self.HALF_OPEN:
+            self._timeout = min(self.reset_timeout_max, self._timeout * 2)
+        elif self.failures < self.threshold:
+            return
+
+        if self.state != self.OPEN:
+            _LOGGER.warning(f"서버 연속 {self.failures}회 실패, {self._timeout}초 동안 조회 중단")
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self):
+        """결과 없이 끝난 요청 (취소 등)"""
+        self._probing = False
+
+
+class FleetScheduler:
+    """여러 config entry 의 폴링을 하나로 조율
+
+    - 전체 동시 폴링 수 제한 (HA 이벤트 루프 보호)
+    - 서버(IP)별 동시 연결 수 제한
+    - 서버(IP)별 token bucket 으로 요청 속도 제한
+    - 서버(IP)별 circuit breaker 로 응답 없는 서버 조회 차단
+    - 서버(IP)별 파이프라인 요청 지원 여부 기억
+    """
+
+    def __init__(
+        self,
+        max_concurrency=FLEET_MAX_CONCURRENCY,
+        max_per_server=FLEET_MAX_PER_SERVER,
+        rate_per_server=FLEET_RATE_PER_SERVER,
+        burst_per_server=FLEET_BURST_PER_SERVER,
+    ):
+        self.max_per_server = max_per_server
+        self.rate_per_server = rate_per_server
+        self.burst_per_server = burst_per_server
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._servers = {}
+        self._breakers = {}
+
+        # 서버(IP)별 파이프라인 요청 지원 여부 (확인 전에는 없음, HA 재시작 전까지 유지)
+        self.pipelining = {}
+
+    def breaker(self, ip):
+        """서버 ip 의 circuit breaker"""
+        breaker = self._breakers.get(ip)
+        if breaker is None:
+            breaker = self._breakers[ip] = CircuitBreaker()
+        return breaker
+
+    def _server(self, ip):
+        server = self._servers.get(ip)
+        if server is None:
+            server = self._servers[ip] = (
+                asyncio.Semaphore(self.max_per_server),
+                TokenBucket(self.rate_per_server, self.burst_per_server),
+            )
+        return server
+
+    @asynccontextmanager
+    async def slot(self, ip):
+        """서버 ip 로 요청을 보낼 수 있을 때까지 대기 후 슬롯 점유"""
+        semaphore, bucket = self._server(ip)
+        async with semaphore:
+            await bucket.acquire()
+            async with self._global:
+                yield
@@ -0,0 +1,132 @@
+import logging
+import time
+
+from .const import HOUSEHOLD_SHARE_WINDOW
+from .exceptions import AuthenticationError
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Household:
+    """같은 세대를 조회하는 API 목록과 마지막 조회 결과 (첫 번째 API 가 대표로 조회)"""
+
+    __slots__ = ("members", "snapshot", "updated")
+
+    def __init__(self):
+        self.members = []
+        self.snapshot = None
+        self.updated = 0.0
+
+    @property
+    def leader(self):
+        return self.members[0]
+
+
+class HouseholdRegistry:
+    """같은 세대(단지 서버 IP, 타운/동/호)를 조회하는 config entry 들의 폴링 공유
+
+    가족 계정이나 다시 만든 설정처럼 여러 entry 가 같은 세대를 조회하면 세대의 첫 entry(대표) API 만
+    서버에 조회하고, 조회 결과(EnergySnapshot)는 같은 세대의 모든 entry 에 전달한다.
+    대표가 아닌 entry 는 유지하던 연결을 닫으며, 대표 entry 가 제거되면 다음 entry 가 이어서 조회한다.
+    세대 정보를 아직 모르는 API 는 직접 조회한 뒤 세대에 합류한다.
+    """
+
+    def __init__(self, share_window=HOUSEHOLD_SHARE_WINDOW):
+        self.share_window = share_window
+        self._households = {}
+        self._keys = {}
+        self._listeners = {}
+
+    @staticmethod
+    def household_key(api):
+        """세대 키 (세대 정보를 모르면 None)"""
+        metadata = api.metadata
+        if metadata is None:
+            return None
+        return (api.ip, metadata["town"], metadata["dong"], metadata["ho"])
+
+    def register(self, api, listener):
+        """API 등록. listener 는 같은 세대의 다른 entry 가 조회한 결과를 받는 함수. 등록 해제 함수 반환"""
+        self._listeners[api] = listener
+
+        def unregister():
+            self._leave(api)
+            self._listeners.pop(api, None)
+
+        return unregister
+
+    def household(self, api):
+        """API 가 속한 세대 (합류 전이면 None)"""
+        key = self._keys.get(api)
+        return self._households.get(key) if key is not None else None
+
+    async def async_poll(self, api):
+        """세대 단위로 공유되는 에너지 조회 결과 반환
+
+        share_window 안에 같은 세대의 조회 결과가 있으면 그대로 반환하고, 없으면 대표 API 로 조회해
+        같은 세대의 다른 entry 에 전달한다. 대표 API 의 조회가 진행 중이면 그 결과를 함께 받는다.
+        """
+        household = await self._join(api)
+        if household is None:
+            snapshot = await api.get_energy_data()
+            # 첫 조회로 세대 정보를 알게 된 경우 합류 (다른 entry 에 전달)
+            household = await self._join(api)
+            if household is not None:
+                self._publish(household, snapshot, api)
+            return snapshot
+
+        if household.snapshot is not None and time.monotonic() - household.updated < self.share_window:
+            return household.snapshot
+
+        try:
+            snapshot = await household.leader.get_energy_data()
+        except AuthenticationError:
+            if household.leader is api:
+                raise
+            # 대표 entry 의 인증 정보가 바뀐 경우 등은 직접 조회
+            return await api.get_energy_data()
+
+        if snapshot is not household.snapshot:
+            self._publish(household, snapshot, api)
+        return snapshot
+
+    def _publish(self, household, snapshot, source):
+        """조회 결과를 세대 결과로 저장하고 요청한 API 외의 entry 에 전달"""
+        household.snapshot = snapshot
+        household.updated = time.monotonic()
+        for member in household.members:
+            if member is not source:
+                self._listeners[member](snapshot)
+
+    async def _join(self, api):
+        """현재 세대 키의 세대에 합류 (IP/세대 정보가 바뀐 경우 이전 세대에서 이동)"""
+        key = self.household_key(api)
+        if key == self._keys.get(api):
+            return self._households.get(key) if key is not None else None
+
+        self._leave(api)
+        if key is None:
+            return None
+
+        household = self._households.get(key)
+        if household is None:
+            household = self._households[key] = _Household()
+        household.members.append(api)
+        self._keys[api] = key
+
+        if household.leader is not api:
+            _LOGGER.info(f"같은 세대를 조회하는 설정이 있어 조회를 공유합니다 (세대 {len(household.members)}개 설정)")
+            # 대표 API 가 조회하므로 유지하던 연결 종료
+            await api.close()
+        return household
+
+    def _leave(self, api):
+        key = self._keys.pop(api, None)
+        household = self._households.get(key)
+        if household is None:
+            return
+
+        household.members.remove(api)
+        if not household.members:
+            del self._households[key]
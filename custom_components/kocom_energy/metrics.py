@@ -0,0 +1,132 @@
+import time
+from asyncio import CancelledError
+from bisect import bisect_left
+
+
+# 지연 시간 histogram 구간 상한 (ms, 마지막 구간은 그 이상 전부)
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+# 요청 단계 (pipeline 은 이어서 보낸 요청 묶음, poll 은 재시도를 포함한 전체 에너지 조회)
+PHASES = ("connect", "auth", "menu", "addr", "energy", "pipeline", "history", "keepalive", "poll")
+
+
+class Histogram:
+    """고정 구간 지연 시간 histogram (기록은 구간 검색 한 번과 덧셈뿐)"""
+
+    __slots__ = ("counts", "count", "total", "maximum")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect_left(LATENCY_BUCKETS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.maximum:
+            self.maximum = ms
+
+    def quantile(self, q):
+        """q 분위 지연 시간 추정값 (ms, 구간 안에서 선형 보간). 기록이 없으면 None"""
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.maximum
+                return round(min(self.maximum, lower + (upper - lower) * (rank - seen) / count), 1)
+            seen += count
+        return round(self.maximum, 1)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.maximum, 1),
+            "mean_ms": round(self.total / self.count, 1) if self.count else None,
+        }
+
+
+class _Phase:
+    """단계 하나의 시간 측정 context manager (API 잠금 안에서 순차적으로만 사용)"""
+
+    __slots__ = ("_metrics", "_name", "_histogram", "_start")
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+        self._histogram = metrics.latency[name]
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._histogram.observe((time.perf_counter() - self._start) * 1000)
+        # 취소는 실패로 기록하지 않음
+        if exc_type is not None and not issubclass(exc_type, CancelledError):
+            self._metrics.failure(self._name, exc_type.__name__)
+        return False
+
+
+class PhaseMetrics:
+    """API 요청 단계별 지연 시간, 실패 유형별 횟수, 송수신 bytes"""
+
+    def __init__(self):
+        self.latency = {phase: Histogram() for phase in PHASES}
+        self.failures = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.polls = 0
+        self.poll_failures = 0
+        # 유지된 연결이 끊어져 재연결 후 다시 요청한 횟수 (실패로 기록하지 않음)
+        self.reconnects = 0
+        self._last_failure = None
+        self._phases = {phase: _Phase(self, phase) for phase in PHASES}
+
+    def phase(self, name):
+        """with metrics.phase("menu"): ... 형태로 단계 시간 및 실패 기록"""
+        return self._phases[name]
+
+    def failure(self, phase, error):
+        key = f"{phase}.{error}"
+        self.failures[key] = self.failures.get(key, 0) + 1
+        self._last_failure = key
+
+    def attempt(self):
+        """요청 시도 시작 (reconnect 가 이전 시도의 실패를 되돌리지 않도록 초기화)"""
+        self._last_failure = None
+
+    def reconnect(self):
+        """유지된 연결이 끊어져 재연결하는 경우, 이번 시도에서 기록한 실패를 재연결로 바꿔 기록"""
+        key = self._last_failure
+        if key is not None:
+            self.failures[key] -= 1
+            if not self.failures[key]:
+                del self.failures[key]
+            self._last_failure = None
+        self.reconnects += 1
+
+    def poll(self, success):
+        """전체 에너지 조회 결과 기록"""
+        self.polls += 1
+        if not success:
+            self.poll_failures += 1
+
+    def as_dict(self):
+        return {
+            "polls": self.polls,
+            "poll_failures": self.poll_failures,
+            "reconnects": self.reconnects,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency": {phase: histogram.as_dict() for phase, histogram in self.latency.items() if histogram.count},
+            "failures": dict(sorted(self.failures.items())),
+        }
@@ -0,0 +1,144 @@
+import asyncio
+import cProfile
+import datetime
+import functools
+import io
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+
+from .const import DOMAIN
+from .api import API
+from .sensor import KocomEnergyProcessor
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# 결과 파일에 남길 함수/메모리 할당 위치 수
+PROFILE_TOP = 40
+
+# 통합 구성요소 소스 경로 (프로파일/메모리 추적 결과 필터)
+PACKAGE_DIR = os.path.dirname(__file__)
+
+
+class Profiler:
+    """정해진 시간 동안 cProfile 과 tracemalloc 으로 통합 구성요소 동작 측정
+
+    측정 중에만 에너지 조회, coordinator 갱신, 센서 값 계산 함수를 시간 측정 함수로 바꾸고
+    끝나면 원래 함수로 되돌리므로 측정하지 않을 때는 추가 비용이 없다.
+    결과는 config/kocom_energy/profile_<시각>.prof (pstats) 와 .txt (요약) 로 저장한다.
+    """
+
+    def __init__(self, hass):
+        self.hass = hass
+        self.running = False
+        self._timings = {}
+        self._restore = []
+
+    async def async_run(self, seconds):
+        """seconds 동안 측정 후 요약 파일 경로 반환"""
+        if self.running:
+            raise RuntimeError("이미 측정 중입니다.")
+        self.running = True
+
+        profile = cProfile.Profile()
+        started_tracemalloc = not tracemalloc.is_tracing()
+        self._timings = {}
+        tracing = False
+        try:
+            self._patch()
+            # 다른 프로파일러가 실행 중이면 ValueError (Python 3.12+), 이 경우 tracemalloc 은 시작하지 않음
+            profile.enable()
+            try:
+                if started_tracemalloc:
+                    tracemalloc.start()
+                    tracing = True
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+                snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        finally:
+            # 직접 시작한 tracemalloc 은 어떤 경우에도 종료 (운영 중 모든 할당을 추적하지 않도록)
+            if tracing:
+                tracemalloc.stop()
+            self._unpatch()
+            self.running = False
+
+        return await self.hass.async_add_executor_job(self._write, profile, snapshot, seconds)
+
+    def _record(self, name, start):
+        self._timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+    def _timed(self, name, func):
+        """호출 시간을 기록하는 함수로 감싸기 (coroutine 함수는 await 완료까지)"""
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self._record(name, start)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._record(name, start)
+        return wrapper
+
+    def _replace(self, owner, attribute, name):
+        original = owner.__dict__[attribute]
+        setattr(owner, attribute, self._timed(name, getattr(owner, attribute)))
+        self._restore.append((owner, attribute, original))
+
+    def _patch(self):
+        self._replace(API, "get_energy_data", "get_energy_data")
+        self._replace(KocomEnergyProcessor, "refresh", "sensor_refresh")
+
+        for data in self.hass.data.get(DOMAIN, {}).values():
+            coordinator = data.get("coordinator") if isinstance(data, dict) else None
+            if coordinator is not None:
+                self._replace(coordinator, "update_method", "coordinator_update")
+
+    def _unpatch(self):
+        while self._restore:
+            owner, attribute, original = self._restore.pop()
+            setattr(owner, attribute, original)
+
+    def _write(self, profile, snapshot, seconds):
+        """측정 결과 파일 저장 (executor 에서 실행)"""
+        directory = self.hass.config.path(DOMAIN)
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"profile_{datetime.datetime.now():%Y%m%d_%H%M%S}")
+
+        profile.dump_stats(f"{base}.prof")
+
+        summary = io.StringIO()
+        summary.write(f"# kocom_energy profile ({seconds}s)\n\n## 호출 시간 (ms)\n")
+        for name, samples in sorted(self._timings.items()):
+            samples.sort()
+            summary.write(
+                f"{name:<20} count {len(samples):>5}  total {sum(samples):10.1f}  "
+                f"p50 {samples[len(samples) // 2]:8.2f}  max {samples[-1]:8.2f}\n"
+            )
+
+        summary.write("\n## cProfile (통합 구성요소 함수, 누적 시간 순)\n")
+        stats = pstats.Stats(profile, stream=summary)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PACKAGE_DIR, PROFILE_TOP)
+
+        summary.write("\n## tracemalloc (통합 구성요소 할당 위치)\n")
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces([tracemalloc.Filter(True, os.path.join(PACKAGE_DIR, "*"))])
+            for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+                summary.write(f"{stat}\n")
+
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+
+        _LOGGER.info(f"프로파일 결과 저장 : {base}.txt, {base}.prof")
+        return f"{base}.txt"
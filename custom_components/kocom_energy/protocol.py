@@ -0,0 +1,169 @@
+import hashlib
+import struct
+from functools import lru_cache
+
+from .exceptions import ProtocolError
+
+
+# 모든 요청/응답 패킷은 28 bytes 헤더로 시작
+#   0 : magic (78563412)
+#   4 : opcode (little-endian, 응답은 요청 opcode + 1)
+#   6 : flags (1001)
+#   8 : 헤더 이후 payload 길이 (little-endian)
+#  12 : 요청별 필드 (타운/동/호 등)
+MAGIC = b"\x78\x56\x34\x12"
+HEADER = struct.Struct("<4sHHI16s")
+
+# 오류 응답은 opcode 하위 byte 가 0x10 (요청 opcode 와 관계없음)
+ERROR_RESPONSE_PREFIX = MAGIC + b"\x10"
+
+# 비정상 길이 값으로 메모리를 과도하게 할당하지 않도록 제한
+MAX_PAYLOAD_SIZE = 64 * 1024
+
+# 요청 opcode (응답은 요청 opcode + 1)
+OP_AUTH = 0x0000
+OP_ADDR = 0x0002
+OP_ENERGY_TYPE_1 = 0x0078
+OP_ENERGY_TYPE_3 = 0x0190
+OP_MENU = 0x0BB8
+FLAGS = 0x0110
+
+# 세대 필드 (헤더 12 ~ 28) : 타운, 동, 호 (각 2 bytes 뒤 0 채움)
+HOUSEHOLD_FIELDS = struct.Struct("<2s2x2s2x2s6x")
+
+# 인증 요청 payload : 아이디(md5), 비밀번호(md5), 단말 유형(2), fcm 토큰, 전화번호
+AUTH_PAYLOAD = struct.Struct("<24x40s40sI256s16s")
+
+# 주소 조회 요청 payload
+ADDR_PAYLOAD = struct.Struct("<4xII20x")
+
+# 0300 에너지 요청 payload : 조회 조건, 조회 월(YYYY-MM-00 00:00:00) 2회, 항목 목록
+ENERGY_TYPE_3_PAYLOAD = struct.Struct("<III19sx19sx9s11x")
+
+
+def encode_frame(opcode, payload=b"", fields=b""):
+    """헤더 + payload 요청 패킷 조립"""
+    return HEADER.pack(MAGIC, opcode, FLAGS, len(payload), fields) + payload
+
+
+def frame_opcode(frame):
+    """패킷의 opcode"""
+    return int.from_bytes(frame[4:6], "little")
+
+
+# 세대/계정과 무관한 고정 요청 및 정상 인증 응답
+MENU_REQUEST = encode_frame(OP_MENU, bytes(4))
+ADDR_REQUEST = encode_frame(OP_ADDR, ADDR_PAYLOAD.pack(0x18, 0xF0))
+AUTH_OK_RESPONSE = encode_frame(OP_AUTH + 1, bytes(4))
+
+
+def credential_fields(username, password, fcm="", phone=""):
+    """설정 화면 입력값을 config entry 에 저장하는 인증 필드(hex 문자열)로 변환
+
+    아이디/비밀번호는 md5 해싱 후 고정 길이로 0 채움. 기존 config entry 와 같은 형식을 유지한다.
+    """
+    return {
+        "username": _pad(hashlib.md5(username.encode()).hexdigest(), 40).hex(),
+        "password": _pad(hashlib.md5(password.encode()).hexdigest(), 40).hex(),
+        "fcm": _pad(fcm, 256).hex(),
+        "phone": _pad(phone, 16).hex(),
+    }
+
+
+def _pad(value, size):
+    return value.encode()[:size].ljust(size, b"\x00")
+
+
+# 0100 에너지 요청의 조회 월 목록 최소 길이 (정기 조회 세 달 "YYYYMM,YYYYMM,YYYYMM")
+# 이보다 짧은 목록(이번달만 조회)은 0 으로 채워 기존 요청과 같은 payload 길이(0x20)로 전송
+ENERGY_TYPE_1_MONTHS_SIZE = 20
+
+
+@lru_cache(maxsize=None)
+def _energy_type_1_payload(size):
+    """0100 에너지 요청 payload : 조회 월 목록(YYYYMM,YYYYMM,...) 뒤 12 bytes 0"""
+    return struct.Struct(f"<{max(size, ENERGY_TYPE_1_MONTHS_SIZE)}s12x")
+
+
+class RequestEncoder:
+    """config entry 하나의 요청 패킷 조립
+
+    인증/메뉴/주소 요청처럼 값이 변하지 않는 패킷은 한 번만 만들어 두고,
+    에너지 요청은 미리 컴파일한 struct 로 재사용하는 bytearray 에 직접 기록한다.
+    전송 시 transport 가 바로 보내거나 남은 부분을 복사해 두므로, 응답을 기다리지 않고
+    이어서 보내는 경우(파이프라인)에도 버퍼를 덮어쓸 때 전송 중인 데이터는 없다.
+    """
+
+    menu = MENU_REQUEST
+    addr = ADDR_REQUEST
+    auth_ok = AUTH_OK_RESPONSE
+
+    def __init__(self, username, password, fcm, phone):
+        """인증 필드는 config entry 에 저장된 hex 문자열"""
+        self.auth = encode_frame(
+            OP_AUTH,
+            AUTH_PAYLOAD.pack(
+                bytes.fromhex(username),
+                bytes.fromhex(password),
+                2,
+                bytes.fromhex(fcm),
+                bytes.fromhex(phone),
+            ),
+        )
+        self._household = None
+        self._fields = None
+        self._buffers = {}
+
+    def _buffer(self, opcode, size):
+        """opcode/payload 크기별 재사용 버퍼 (헤더는 세대 정보가 바뀔 때만 다시 기록)"""
+        key = (opcode, size)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = bytearray(HEADER.size + size)
+            HEADER.pack_into(buffer, 0, MAGIC, opcode, FLAGS, size, self._fields)
+        return buffer
+
+    def _set_household(self, household):
+        """세대 정보(타운/동/호 hex 문자열 tuple)가 바뀐 경우 헤더 필드 갱신"""
+        if household == self._household:
+            return
+        self._household = household
+        self._fields = HOUSEHOLD_FIELDS.pack(*(bytes.fromhex(value) for value in household))
+        self._buffers.clear()
+
+    def energy_type_1(self, household, months):
+        """0100 에너지 요청 (months : YYYYMM 목록, 개월 수에 따라 payload 길이 변경)"""
+        self._set_household(household)
+        months = ",".join(months).encode("ascii")
+        layout = _energy_type_1_payload(len(months))
+        buffer = self._buffer(OP_ENERGY_TYPE_1, layout.size)
+        layout.pack_into(buffer, HEADER.size, months)
+        return buffer
+
+    def energy_type_3(self, household, month):
+        """0300 에너지 요청 (month : YYYY-MM-00 00:00:00)"""
+        self._set_household(household)
+        month = month.encode("ascii")
+        buffer = self._buffer(OP_ENERGY_TYPE_3, ENERGY_TYPE_3_PAYLOAD.size)
+        ENERGY_TYPE_3_PAYLOAD.pack_into(buffer, HEADER.size, 2, 2, 1, month, month, b"1,2,3,4,5")
+        return buffer
+
+
+async def read_frame(reader):
+    """헤더의 payload 길이만큼 정확히 읽어 패킷 하나(헤더 + payload)를 반환
+
+    TCP 세그먼트가 나뉘거나 다음 응답과 붙어서 도착해도 패킷 단위로 분리된다.
+    magic 이나 길이가 잘못된 경우 즉시 ProtocolError 발생.
+    서버가 연결을 끊으면 asyncio.IncompleteReadError 발생.
+    """
+    header = await reader.readexactly(HEADER.size)
+    magic, opcode, flags, length, fields = HEADER.unpack(header)
+
+    if magic != MAGIC:
+        raise ProtocolError(f"잘못된 패킷 헤더: {header[:4].hex()}")
+    if length > MAX_PAYLOAD_SIZE:
+        raise ProtocolError(f"패킷 길이 초과: {length}")
+
+    if not length:
+        return header
+    return header + await reader.readexactly(length)
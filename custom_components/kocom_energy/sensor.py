@@ -1,13 +1,33 @@
 import logging
 import datetime
+import os
 import math
+import asyncio
 
-from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator
+import aiohttp
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator, UpdateFailed
 from homeassistant.components.sensor import SensorEntity
+from homeassistant.const import EntityCategory
+from homeassistant.util import dt as dt_util
 from datetime import timedelta
 
-from .const import DOMAIN, DEVICE_ID
+from .const import DOMAIN, DEVICE_ID, DEFAULT_MAX_INTERVAL, DISCOVERY_FAILURE_THRESHOLD, SESSION_MAX_INTERVAL
 from .api import API
+from .store import KocomEnergyStore
+from .adaptive import AdaptiveInterval
+from .capture import PacketCapture
+from .discovery import get_discovery
+from .decoder import FIELDS, EnergySnapshot
+from .statistics import HourlyStatisticsWriter
+from .exceptions import (
+    KocomEnergyError,
+    ConnectionFailedError,
+    ResponseTimeoutError,
+    CircuitOpenError,
+    AuthenticationError,
+    IpAddressNotFoundError,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -57,6 +77,41 @@ SENSOR_TYPES = {
     }
 }
 
+# 월 누계 변화량으로 계산하는 유틸리티별 일별/시간별 사용량 센서
+DELTA_PERIODS = {
+    "daily": "Daily",
+    "hourly": "Hourly",
+}
+
+for _utility in ("electricity", "gas", "water", "hot_water", "heating"):
+    for _period, _label in DELTA_PERIODS.items():
+        SENSOR_TYPES[f"{_utility}_{_period}"] = {
+            **SENSOR_TYPES[_utility],
+            "name": SENSOR_TYPES[_utility]["name"].replace(" Usage", f" {_label} Usage"),
+        }
+
+# 요청 단계별 지연 시간/실패/송수신량 진단 센서 (API.metrics)
+DIAGNOSTIC_SENSOR_TYPES = {
+    "poll_latency": {
+        "name": "Kocom Poll Latency",
+        "unit_of_measurement": "ms",
+        "state_class": "measurement",
+        "icon": "mdi:timer-outline"
+    },
+    "poll_failures": {
+        "name": "Kocom Poll Failures",
+        "unit_of_measurement": None,
+        "state_class": "total_increasing",
+        "icon": "mdi:alert-circle-outline"
+    },
+    "bytes_transferred": {
+        "name": "Kocom Bytes Transferred",
+        "unit_of_measurement": "B",
+        "state_class": "total_increasing",
+        "icon": "mdi:swap-vertical"
+    },
+}
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up the KocomEnergySensor from a config entry."""
     _LOGGER.debug(f"Entry Data : {entry.data}")
@@ -65,30 +120,131 @@ async def async_setup_entry(hass, entry, async_add_entities):
 
     update_interval = entry.data.get("update_interval")
 
-    async def async_update_kocom_energy():
-        _LOGGER.info(f"==================== 센서 업데이트 시작 ====================")
+    # 세대 정보 등 폴링 간 유지할 데이터 로드
+    store = KocomEnergyStore(hass, entry.entry_id)
+    await store.async_load()
+
+    # 단지 서버 IP 조회 (연결 실패가 반복될 때만 사용, 서버가 이전한 경우 설정을 다시 하지 않아도 새 IP 로 접속)
+    discovery = get_discovery(hass)
+    username = entry.data.get("original_username")
+
+    # 코콤 데이터 API 생성 (config entry 당 하나의 세션, 갱신 주기가 SESSION_MAX_INTERVAL 이하일 때만 폴링 간 연결 재사용)
+    # 접속 IP 는 인증을 확인한 entry.data["ip"]
+    api = API(
+        ip=entry.data.get("ip"),
+        username=entry.data.get("username"),
+        password=entry.data.get("password"),
+        fcm=entry.data.get("fcm"),
+        phone=entry.data.get("phone"),
+        metadata=store.get("metadata"),
+        closed_months=store.get("closed_months"),
+        scheduler=hass.data[DOMAIN]["fleet"],
+        pipelining=entry.options.get("pipelining", False),
+        keep_session=update_interval <= SESSION_MAX_INTERVAL,
+    )
+    entry.async_on_unload(api.close)
 
-        try:
-            # 코콤 데이터 API 생성
-            api = API(
-                ip=entry.data.get("ip"),
-                username=entry.data.get("username"),
-                password=entry.data.get("password"),
-                fcm=entry.data.get("fcm"),
-                phone=entry.data.get("phone"),
-            )
-            
-            energy_response_dict = await api.get_energy_data()
+    # 패킷 캡처 (옵션) : config/kocom_energy/capture_<entry_id>.bin 에 ring buffer 로 기록
+    if entry.options.get("packet_capture", False):
+        path = hass.config.path(DOMAIN, f"capture_{entry.entry_id}.bin")
 
-            now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            _LOGGER.info("Updating sensor, State: %s", now)
-            _LOGGER.info("Updating sensor, Attributes: %s", energy_response_dict)
-            _LOGGER.info(f"==================== 센서 업데이트 종료 ====================")
+        def open_capture():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            return PacketCapture(path)
 
-            return energy_response_dict
+        api.capture = await hass.async_add_executor_job(open_capture)
+        _LOGGER.info(f"패킷 캡처 사용 : {path}")
 
-        except Exception as e:
-            _LOGGER.error("센서 업데이트 오류: %s", e)
+        async def async_close_capture():
+            capture, api.capture = api.capture, None
+            await hass.async_add_executor_job(capture.close)
+
+        entry.async_on_unload(async_close_capture)
+
+    # 적응형 폴링 : 서버 검침값 갱신 주기를 학습해 최소/최대 간격 안에서 갱신 주기 조정
+    adaptive = None
+    # 옵션에서 켠 경우에만 사용하며, 최소 간격 기본값은 사용자가 선택한 갱신 주기 (그보다 자주 폴링하지 않음)
+    if entry.options.get("adaptive_polling", False):
+        adaptive = AdaptiveInterval(
+            base=update_interval,
+            minimum=entry.options.get("min_interval", update_interval),
+            maximum=entry.options.get("max_interval", DEFAULT_MAX_INTERVAL),
+            state=store.get("adaptive"),
+        )
+
+    # 같은 세대를 조회하는 다른 설정과 조회 공유
+    households = hass.data[DOMAIN]["households"]
+
+    # 연속 연결 실패 횟수 (단지 서버 IP 재조회 판단용)
+    connection_failures = 0
+
+    async def async_update_kocom_energy():
+        nonlocal connection_failures
+        _LOGGER.info(f"==================== 센서 업데이트 시작 ====================")
+
+        try:
+            energy = await households.async_poll(api)
+        except KocomEnergyError as e:
+            energy = None
+            error = e
+        else:
+            error = None
+
+        # 세대 정보, 마감 월 캐시 저장 (오류로 초기화된 경우 삭제)
+        store.set("metadata", api.metadata)
+        store.set("closed_months", api.closed_months)
+
+        # 이번달 검침값 변화에 따라 다음 갱신 주기 조정 (진행 중인 조회에 합류한 경우 이미 반영됨)
+        if adaptive is not None and (energy is None or energy is not coordinator.data):
+            values = None
+            if energy is not None:
+                values = tuple(getattr(energy, key) for key in sorted(KocomEnergyProcessor.USAGE_KEYS.values()))
+            seconds = adaptive.update(values, dt_util.now())
+            coordinator.update_interval = timedelta(seconds=seconds)
+            store.set("adaptive", adaptive.as_dict())
+            _LOGGER.debug(f"다음 갱신 주기 : {seconds:.0f}초 (학습된 서버 갱신 주기 : {adaptive.period})")
+
+            # 다음 폴링까지 길면 keepalive 를 보내며 기다리지 않고 연결 종료 (다음 폴링에서 재연결)
+            api.keep_session = seconds <= SESSION_MAX_INTERVAL
+            if not api.keep_session:
+                await api.close()
+
+        # 연결 실패가 반복되면 서버 이전 여부 확인을 위해 IP 재조회
+        if isinstance(error, (ConnectionFailedError, ResponseTimeoutError, CircuitOpenError)):
+            connection_failures += 1
+        elif isinstance(error, AuthenticationError) and api.ip != entry.data.get("ip"):
+            # 재조회한 IP 에서 인증 실패 : 다른 단지 서버이므로 설정된 IP 로 복귀
+            _LOGGER.warning(f"재조회한 단지 서버({api.ip})에서 인증 실패, 설정된 IP 로 복귀 : {entry.data.get('ip')}")
+            api.set_address(entry.data.get("ip"))
+            connection_failures = 0
+        else:
+            connection_failures = 0
+
+        if username and connection_failures >= DISCOVERY_FAILURE_THRESHOLD:
+            connection_failures = 0
+            try:
+                api.set_address(await discovery.async_discover(username))
+            except (aiohttp.ClientError, asyncio.TimeoutError, IpAddressNotFoundError) as e:
+                _LOGGER.warning(f"단지 서버 IP 재조회 실패 : {e}")
+
+        if error is None and api.ip != entry.data.get("ip"):
+            # 재조회한 IP 에서 인증까지 성공한 경우에만 설정된 IP 로 저장
+            _LOGGER.info(f"단지 서버 IP 확인, 설정 저장 : {entry.data.get('ip')} -> {api.ip}")
+            hass.config_entries.async_update_entry(entry, data={**entry.data, "ip": api.ip})
+
+        if error is not None:
+            raise UpdateFailed(f"에너지 사용량 조회 실패: {error}") from error
+
+        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # 재시작 시 바로 센서를 복원할 수 있도록 마지막 정상 조회 결과 저장
+        store.set("snapshot", {"data": energy.as_dict(), "fetched": now})
+
+        _LOGGER.info("Updating sensor, State: %s", now)
+        _LOGGER.info("Updating sensor, Attributes: %s", energy)
+        _LOGGER.info(f"==================== 센서 업데이트 종료 ====================")
+
+        return energy
 
     # Create the coordinator
     coordinator = DataUpdateCoordinator(
@@ -96,36 +252,306 @@ async def async_setup_entry(hass, entry, async_add_entities):
         _LOGGER,
         name="sensor",
         update_method   = async_update_kocom_energy,            # 코콤 에너지 조회 API
-        update_interval = timedelta(seconds=update_interval)    # 사용자 정의 갱신 주기
+        update_interval = timedelta(seconds=update_interval),   # 사용자 정의 갱신 주기
+        # 수동 갱신(kocom_energy.refresh) 요청은 coordinator 기본 debouncer 가 첫 요청만 바로 실행하고
+        # 10초 cooldown 동안의 요청은 한 번으로 합침
     )
 
-    # Fetch initial data
-    # 데이터 갱신 시 사용하지만 오류 발생하더라도 예외 발생하지 않고 통합구성요소 설치 완료 됨
-    # await coordinator.async_refresh()
-    # 통합구성 요소가 처음 설정될 때 사용하며 실패할 경우 통합구성 요소의 설정을 중단
-    await coordinator.async_config_entry_first_refresh()
+    @callback
+    def async_shared_update(energy):
+        """같은 세대의 다른 설정이 조회한 결과 반영 (다음 갱신 시각도 다시 계산됨)"""
+        store.set("snapshot", {"data": energy.as_dict(), "fetched": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        coordinator.async_set_updated_data(energy)
+
+    entry.async_on_unload(households.register(api, async_shared_update))
+
+    # 유틸리티별 시간 단위 외부 통계 기록 (에너지 대시보드용, recorder 사용 시)
+    statistics = None
+    if "recorder" in hass.config.components:
+        statistics = HourlyStatisticsWriter(hass, entry, store.get("statistics"))
+        await statistics.async_seed()
 
-    # 나중에 switch 등 다른 플랫폼을 사용할 경우 객체 공유 목적으로 사용
-    # hass.data[DOMAIN][entry.entry_id] = {
-    #     "coordinator": coordinator
-    # }
+    # 모든 센서가 공유하는 값 계산 단계 (coordinator 갱신당 한 번)
+    processor = KocomEnergyProcessor(store, statistics)
+
+    # Fetch initial data
+    snapshot = store.get("snapshot")
+    if snapshot:
+        # 저장된 마지막 정상 조회 결과로 센서를 바로 복원하고, 첫 조회는 백그라운드에서 실행
+        # (HA 시작 시간이 코콤 서버 응답을 기다리지 않음)
+        coordinator.data = EnergySnapshot.from_dict(snapshot["data"])
+        processor.restore(coordinator.data, snapshot["fetched"])
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
+    else:
+        # 통합구성 요소가 처음 설정될 때 사용하며 실패할 경우 통합구성 요소의 설정을 중단
+        await coordinator.async_config_entry_first_refresh()
+
+    # 서비스 및 다른 플랫폼에서 사용할 수 있도록 객체 공유
+    hass.data[DOMAIN][entry.entry_id].update({
+        "api": api,
+        "store": store,
+        "coordinator": coordinator,
+        "statistics": statistics,
+    })
 
     sensors = []
     for sensor_type, sensor_data in SENSOR_TYPES.items():
-        sensors.append(KocomEnergySensor(coordinator, entry, sensor_type, sensor_data))
+        sensors.append(KocomEnergySensor(coordinator, entry, sensor_type, sensor_data, processor))
+    for sensor_type, sensor_data in DIAGNOSTIC_SENSOR_TYPES.items():
+        sensors.append(KocomEnergyDiagnosticSensor(coordinator, entry, sensor_type, sensor_data, api.metrics))
 
     async_add_entities(sensors)
 
 
+class KocomEnergyProcessor:
+    """coordinator 갱신마다 한 번만 전체 센서 값을 계산
+
+    센서 속성을 읽을 때마다 계산하지 않고, 새 coordinator 데이터가 들어온 경우에만
+    유틸리티별 값 계산과 전기 이상치 검증을 수행한다.
+    """
+
+    # 센서 유형별 이번달 사용량 키
+    USAGE_KEYS = {
+        "electricity": "electricity_usage_this_month",
+        "gas": "gas_usage_this_month",
+        "water": "water_usage_this_month",
+        "hot_water": "hot_water_usage_this_month",
+        "heating": "heating_usage_this_month",
+    }
+
+    def __init__(self, store, statistics=None):
+        self.values = {}
+        self._store = store
+
+        # 일별/시간별 사용량 (재시작 후 이어서 계산하도록 상태 저장)
+        self.usage = UsageDeltaEngine(store.get("usage_delta"))
+
+        # 시간별 외부 통계 기록 (recorder 를 사용하지 않으면 None)
+        self._statistics = statistics
+
+        # 마지막으로 정상 조회된 시각 (energy 센서 상태)
+        self.last_fetch = None
+
+        self._data = None
+        self._processed = False
+
+        # 저장소에서 복원한 데이터와 그 조회 시각
+        self._restored = None
+        self._restored_fetch = None
+
+        # 정상 데이터가 수신될 때 이번달 전기 사용량 보관용 변수
+        self._previous_electricity_usage_this_month = None
+        self._previous_electricity_this_month = None
+
+        # 정상 데이터가 수실될 때 지난달 전기 사용량 보관용 변수
+        self._previous_electricity_usage_last_month = None
+        self._previous_electricity_last_month = None
+
+    def restore(self, data, fetched):
+        """저장된 마지막 정상 조회 결과로 시작 (조회 시각은 저장된 값 사용)"""
+        self._restored = data
+        self._restored_fetch = fetched
+
+    def refresh(self, data):
+        """새 coordinator 데이터이면 전체 센서 값 계산 후 반환 (같은 데이터면 이전 결과 반환)"""
+        if self._processed and data is self._data:
+            return self.values
+
+        self._data = data
+        self._processed = True
+        _LOGGER.debug(f"========== 센서 상태 계산 ==========")
+
+        values = {}
+        try:
+            # coordinator.data가 None인 경우 처리
+            if data is None:
+                values = {sensor_type: "unavailable" for sensor_type in self.USAGE_KEYS}  # 오류 발생 시 unavailable 반환
+            else:
+                if data is self._restored:
+                    self.last_fetch = self._restored_fetch
+                else:
+                    self.last_fetch = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                for sensor_type, key in self.USAGE_KEYS.items():
+                    values[sensor_type] = getattr(data, key)
+                    _LOGGER.debug(f"{sensor_type} 이번달 사용량 : {values[sensor_type]}")
+
+                values["electricity"] = self._validate_electricity(data)
+
+                # 검증된 이번달 누계로 일별/시간별 사용량 갱신
+                now = dt_util.now()
+                readings = {utility: values[utility] for utility in self.USAGE_KEYS}
+                deltas = self.usage.update(data, readings, now)
+                self._store.set("usage_delta", self.usage.as_dict())
+
+                # 새로 조회된 결과만 시간별 외부 통계에 반영 (저장소에서 복원한 결과는 이미 반영됨)
+                if self._statistics is not None and data is not self._restored:
+                    self._statistics.update(deltas, readings, now)
+                    self._store.set("statistics", self._statistics.as_dict())
+        except Exception as e:
+            _LOGGER.error(f"센서 데이터 처리 중 오류 발생: {e}")
+            values = {sensor_type: "unknown" for sensor_type in self.USAGE_KEYS}
+
+        # 현재 사용량이 None이면 unknown 반환
+        self.values = {
+            sensor_type: "unknown" if value is None else value
+            for sensor_type, value in values.items()
+        }
+        self.values["energy"] = self.last_fetch
+
+        now = dt_util.now()
+        for utility in self.USAGE_KEYS:
+            for period in DELTA_PERIODS:
+                self.values[f"{utility}_{period}"] = self.usage.value(utility, period, now)
+        return self.values
+
+    def _validate_electricity(self, data):
+        """전기 사용량 이상치 검증. 비정상이면 unknown"""
+        current_usage = data.electricity_usage_this_month
+        this_month = data.this_month
+
+        _LOGGER.debug(f"이번달({this_month}) 전기 사용량 : {current_usage}")
+        _LOGGER.debug(f"이전 응답 지난달 전기 사용량 : {self._previous_electricity_usage_last_month}, 이전 응답 지난달 : {self._previous_electricity_last_month}")
+
+        if (self._previous_electricity_usage_last_month is not None and 
+            self._previous_electricity_last_month is not None and 
+            current_usage is not None and 
+            this_month is not None):
+            
+            # 같은 달의 데이터인 경우에만 비교 (정상적으로 월이 변경되어 전기 사용량이 0으로 초기화 되는 경우 제외)
+            if this_month == self._previous_electricity_this_month:
+                
+                # 현재 사용량과 지난달 사용량이 동일할 경우 비정상 데이터 처리
+                if math.isclose(current_usage, self._previous_electricity_usage_last_month):
+                    _LOGGER.warning(
+                        f"전기 이번달 사용량이 이전 응답의 지난달 사용량과 동일함 "
+                        f"(이번달({this_month}): 전기 사용량 {current_usage}, 이전에 호출된 지난달 사용량: {self._previous_electricity_usage_last_month})"
+                    )
+
+                    # 비정상 일 경우 데이터 처리 중단
+                    return "unknown"
+        
+        # 정상 데이터면 지난달 전기 사용량과 월 정보 저장
+        self._previous_electricity_usage_last_month = data.electricity_usage_last_month
+        self._previous_electricity_last_month = data.last_month
+        
+        # 정상 데이터면 이번달 전기 사용량을 보관
+        self._previous_electricity_usage_this_month = current_usage
+        self._previous_electricity_this_month = this_month
+
+        return current_usage
+
+
+class UsageDeltaEngine:
+    """월 누계 검침값의 변화량으로 일별/시간별 사용량 계산 (폴링당 유틸리티별 O(1))
+
+    - 같은 달이면 이전 검침값과의 차이를 현재 일/시간 누적값에 더함
+    - 달이 바뀌면 지난달 확정값(last_month)에서 이전 검침값을 뺀 나머지와 이번달 누계를 더함
+    - 검침값이 줄어든 경우(서버 오류 등)는 이전 검침값을 유지해 다시 늘어날 때 중복 계산하지 않음
+    - 마지막 검침값과 누적값을 저장해 재시작 후에도 누락/중복 없이 이어서 계산
+    """
+
+    # 기간별 누적 구간 키 (현지 시각 기준)
+    PERIOD_FORMATS = {
+        "daily": "%Y-%m-%d",
+        "hourly": "%Y-%m-%dT%H",
+    }
+
+    def __init__(self, state=None):
+        state = state or {}
+
+        # 유틸리티별 마지막 검침값 {"month": 년월, "value": 이번달 누계}
+        self._readings = {utility: dict(reading) for utility, reading in state.get("readings", {}).items()}
+
+        # 기간별 현재 구간 {"key": 구간 키, "usage": {유틸리티: 사용량}}
+        self._buckets = {
+            period: {"key": bucket["key"], "usage": dict(bucket["usage"])}
+            for period, bucket in state.get("buckets", {}).items()
+            if period in self.PERIOD_FORMATS
+        }
+
+    def as_dict(self):
+        """저장용 상태 (내부 값과 분리된 복사본)"""
+        return {
+            "readings": {utility: dict(reading) for utility, reading in self._readings.items()},
+            "buckets": {
+                period: {"key": bucket["key"], "usage": dict(bucket["usage"])}
+                for period, bucket in self._buckets.items()
+            },
+        }
+
+    def _bucket(self, period, now):
+        """현재 시각의 누적 구간 (구간이 바뀌었으면 새로 시작)"""
+        key = now.strftime(self.PERIOD_FORMATS[period])
+        bucket = self._buckets.get(period)
+        if bucket is None or bucket["key"] != key:
+            bucket = self._buckets[period] = {"key": key, "usage": {}}
+        return bucket
+
+    def update(self, data, values, now):
+        """새 검침값 반영
+
+        data   : 에너지 조회 결과 EnergySnapshot (this_month, last_month, 지난달 확정값 확인용)
+        values : 유틸리티별 검증된 이번달 누계 (숫자가 아니면 건너뜀)
+        now    : 현재 시각 (timezone aware datetime)
+
+        반영한 유틸리티별 이전 검침 이후 사용량 반환 (첫 검침값은 0)
+        """
+        deltas = {}
+        month = data.this_month
+        if month is None:
+            return deltas
+
+        buckets = [self._bucket(period, now) for period in self.PERIOD_FORMATS]
+
+        for utility, value in values.items():
+            if not isinstance(value, (int, float)):
+                continue
+
+            reading = self._readings.get(utility)
+            delta = 0.0
+            if reading is None:
+                # 첫 검침값은 기준값으로만 사용
+                pass
+            elif reading["month"] == month:
+                if value < reading["value"]:
+                    continue
+                delta = value - reading["value"]
+            else:
+                # 월 변경 : 이전 검침 이후 지난달 나머지 사용량 + 이번달 누계
+                delta = value
+                last_month_usage = getattr(data, f"{utility}_usage_last_month")
+                if data.last_month == reading["month"] and isinstance(last_month_usage, (int, float)):
+                    delta += max(0.0, last_month_usage - reading["value"])
+
+            self._readings[utility] = {"month": month, "value": value}
+            for bucket in buckets:
+                bucket["usage"][utility] = bucket["usage"].get(utility, 0.0) + delta
+            deltas[utility] = delta
+        return deltas
+
+    def value(self, utility, period, now):
+        """현재 구간의 사용량 (구간이 바뀐 뒤 아직 폴링 전이면 0)"""
+        bucket = self._buckets.get(period)
+        if bucket is None or bucket["key"] != now.strftime(self.PERIOD_FORMATS[period]):
+            return 0.0
+        return round(bucket["usage"].get(utility, 0.0), 3)
+
+
 class KocomEnergySensor(CoordinatorEntity, SensorEntity):
     """Kocom Energy Sensor using DataUpdateCoordinator."""
 
-    def __init__(self, coordinator, entry, sensor_type, sensor_data):
+    # 전체 조회 데이터 속성은 템플릿/연계용으로만 제공하고 recorder 에는 기록하지 않음 (진단 정보로 확인)
+    _unrecorded_attributes = frozenset(FIELDS)
+
+    def __init__(self, coordinator, entry, sensor_type, sensor_data, processor):
         """Initialize the sensor."""
         super().__init__(coordinator)
 
         self._entry = entry
         self._sensor_type = sensor_type
+        self._processor = processor
         self._name = sensor_data["name"]
         self._entry_id = f"{DOMAIN}.{entry.data.get('username')}_{self._name.lower().replace(' ', '_')}"
         self._unique_id = f"{DOMAIN}.{entry.data.get('username')}_{self._name.lower().replace(' ', '_')}"
@@ -140,17 +566,25 @@ class KocomEnergySensor(CoordinatorEntity, SensorEntity):
             "model": "Kocom Energy"
         }
 
-        # 정상 데이터가 수신될 때 이번달 전기 사용량 보관용 변수
-        self._previous_electricity_usage_this_month = None
-        self._previous_electricity_this_month = None
+        # 마지막으로 기록한 상태 (변경된 경우에만 상태 기록)
+        self._state = processor.refresh(coordinator.data).get(sensor_type)
+        self._available = None
 
-        # 정상 데이터가 수실될 때 지난달 전기 사용량 보관용 변수
-        self._previous_electricity_usage_last_month = None
-        self._previous_electricity_last_month = None
+    @callback
+    def _handle_coordinator_update(self):
+        """coordinator 갱신 시 값이 바뀐 경우에만 상태 기록"""
+        state = self._processor.refresh(self.coordinator.data).get(self._sensor_type)
+        available = self.available
+
+        if state == self._state and available == self._available:
+            return
+
+        self._state = state
+        self._available = available
+        self.async_write_ha_state()
 
     @property
     def device_info(self):
-        _LOGGER.debug(f"Device ID : {DEVICE_ID}")
         return self._device_info
 
     # @property
@@ -188,87 +622,87 @@ class KocomEnergySensor(CoordinatorEntity, SensorEntity):
 
     @property
     def state(self):
-        _LOGGER.debug(f"========== 센서 상태 변경({self._sensor_type}) ==========")
+        return self._state
 
+    @property
+    def state_attributes(self):
+        if self._sensor_type == "energy" and self.coordinator.data is not None:
+            # 전체 응답 데이터를 속성값으로 할당
+            return self.coordinator.data.as_dict()
+        return {}
 
-        
 
-        # 각 유틸리티별 현재 사용량과 지난달 사용량 비교
-        current_usage = None
-        
-        
-        try:
-            # coordinator.data가 None이거나 빈 딕셔너리인 경우 처리
-            if not self.coordinator.data:
-                if self._sensor_type == "energy":
-                    # energy 센서는 현재 시간을 계속 표시
-                    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                return "unavailable" # 오류 발생 시 unavailable 반환
-            
-            if self._sensor_type == "energy":
-                return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # 전기 센서인 경우 데이터 검증
-            if self._sensor_type == "electricity":
-                current_usage = self.coordinator.data.get("electricity_usage_this_month")
-                this_month = self.coordinator.data.get("this_month")
-                
-                _LOGGER.debug(f"이번달({this_month}) 전기 사용량 : {current_usage}")
-                _LOGGER.debug(f"이전 응답 지난달 전기 사용량 : {self._previous_electricity_usage_last_month}, 이전 응답 지난달 : {self._previous_electricity_last_month}")
-
-                if (self._previous_electricity_usage_last_month is not None and 
-                    self._previous_electricity_last_month is not None and 
-                    current_usage is not None and 
-                    this_month is not None):
-                    
-                    # 같은 달의 데이터인 경우에만 비교 (정상적으로 월이 변경되어 전기 사용량이 0으로 초기화 되는 경우 제외)
-                    if this_month == self._previous_electricity_this_month:
-                        
-                        # 현재 사용량과 지난달 사용량이 동일할 경우 비정상 데이터 처리
-                        if math.isclose(current_usage, self._previous_electricity_usage_last_month):
-                            _LOGGER.warning(
-                                f"전기 이번달 사용량이 이전 응답의 지난달 사용량과 동일함 "
-                                f"(이번달({this_month}): 전기 사용량 {current_usage}, 이전에 호출된 지난달 사용량: {self._previous_electricity_usage_last_month})"
-                            )
-
-                            # 비정상 일 경우 데이터 처리 중단
-                            return "unknown"
-                
-                # 정상 데이터면 지난달 전기 사용량과 월 정보 저장
-                self._previous_electricity_usage_last_month = self.coordinator.data.get("electricity_usage_last_month")
-                self._previous_electricity_last_month = self.coordinator.data.get("last_month")
-                
-                # 정상 데이터면 이번달 전기 사용량을 보관
-                self._previous_electricity_usage_this_month = current_usage
-                self._previous_electricity_this_month = this_month
+class KocomEnergyDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """요청 단계별 지연 시간, 실패 횟수, 송수신량 진단 센서 (조회 실패 중에도 사용 가능)"""
 
-                return current_usage
-            
-            elif self._sensor_type == "gas":
-                current_usage = self.coordinator.data.get("gas_usage_this_month")
-                _LOGGER.debug(f"이번달 가스 사용량 : {current_usage}")
-            elif self._sensor_type == "water":
-                current_usage = self.coordinator.data.get("water_usage_this_month")
-                _LOGGER.debug(f"이번달 수도 사용량 : {current_usage}")
-            elif self._sensor_type == "hot_water":
-                current_usage = self.coordinator.data.get("hot_water_usage_this_month")
-                _LOGGER.debug(f"이번달 온수 사용량 : {current_usage}")
-            elif self._sensor_type == "heating":
-                current_usage = self.coordinator.data.get("heating_usage_this_month")
-                _LOGGER.debug(f"이번달 난방 사용량 : {current_usage}")
-        except Exception as e:
-            _LOGGER.error(f"{self._sensor_type} 센서 데이터 처리 중 오류 발생: {e}")
-            return "unknown"
-        
-        # 현재 사용량이 None이면 unknown 반환
-        if current_usage is None:
-            return "unknown"
-            
-        return current_usage
+    def __init__(self, coordinator, entry, sensor_type, sensor_data, metrics):
+        super().__init__(coordinator)
+
+        self._sensor_type = sensor_type
+        self._metrics = metrics
+        self._name = sensor_data["name"]
+        self._unique_id = f"{DOMAIN}.{entry.data.get('username')}_{self._name.lower().replace(' ', '_')}"
+        self._unit_of_measurement = sensor_data["unit_of_measurement"]
+        self._state_class = sensor_data["state_class"]
+        self._icon = sensor_data["icon"]
+
+        self._device_info = {
+            "identifiers": {(DOMAIN, DEVICE_ID)},
+            "name": "코콤 에너지",
+            "model": "Kocom Energy"
+        }
+
+    @property
+    def device_info(self):
+        return self._device_info
+
+    @property
+    def unique_id(self):
+        return self._unique_id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def icon(self):
+        return self._icon
+
+    @property
+    def entity_category(self):
+        return EntityCategory.DIAGNOSTIC
+
+    @property
+    def unit_of_measurement(self):
+        return self._unit_of_measurement
+
+    @property
+    def state_class(self):
+        return self._state_class
+
+    @property
+    def available(self):
+        return True
+
+    @property
+    def state(self):
+        metrics = self._metrics
+        if self._sensor_type == "poll_latency":
+            return metrics.latency["poll"].quantile(0.95)
+        if self._sensor_type == "poll_failures":
+            return metrics.poll_failures
+        return metrics.bytes_sent + metrics.bytes_received
 
     @property
     def state_attributes(self):
-        if self._sensor_type == "energy":
-            # 전체 응답 데이터를 속성값으로 할당
-            return self.coordinator.data
-        return {}
+        metrics = self._metrics
+        if self._sensor_type == "poll_latency":
+            # 단계별 p50/p95 (ms)
+            return {
+                f"{phase}_{key}": value
+                for phase, histogram in metrics.latency.items() if histogram.count
+                for key, value in histogram.as_dict().items() if key in ("p50_ms", "p95_ms")
+            }
+        if self._sensor_type == "poll_failures":
+            return {"polls": metrics.polls, **metrics.failures}
+        return {"bytes_sent": metrics.bytes_sent, "bytes_received": metrics.bytes_received}
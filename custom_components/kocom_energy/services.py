@@ -0,0 +1,135 @@
+import logging
+import asyncio
+import datetime
+
+import voluptuous as vol
+import homeassistant.helpers.config_validation as cv
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+
+from .const import DOMAIN, DEFAULT_BACKFILL_MONTHS, DEFAULT_PROFILE_SECONDS
+from .exceptions import KocomEnergyError
+from .statistics import async_import_monthly_statistics
+from .util import add_months
+
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_BACKFILL = "backfill"
+SERVICE_REFRESH = "refresh"
+SERVICE_PROFILE = "profile"
+
+BACKFILL_SCHEMA = vol.Schema({
+    vol.Optional("entry_id"): cv.string,
+    vol.Optional("months", default=DEFAULT_BACKFILL_MONTHS): vol.All(vol.Coerce(int), vol.Range(min=1, max=120)),
+})
+
+
+REFRESH_SCHEMA = vol.Schema({
+    vol.Optional("entry_id"): cv.string,
+})
+
+
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional("seconds", default=DEFAULT_PROFILE_SECONDS): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+})
+
+
+def _loaded(hass, entry):
+    """센서 플랫폼 설정이 끝나 API 세션과 coordinator 가 준비된 config entry 인지 여부"""
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    return isinstance(data, dict) and "api" in data and "coordinator" in data
+
+
+def _target_entries(hass, call):
+    """서비스 대상 config entry 목록 (entry_id 미지정 시 로드된 전체)
+
+    지정한 config entry 가 없거나 아직 설정 중/설정 실패로 로드되지 않았으면 ServiceValidationError 발생
+    """
+    entry_id = call.data.get("entry_id")
+    entries = [
+        entry for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry_id in (None, entry.entry_id)
+    ]
+    if entry_id is not None and entries and not _loaded(hass, entries[0]):
+        raise ServiceValidationError(f"config entry 가 로드되지 않았습니다: {entries[0].title}")
+
+    entries = [entry for entry in entries if _loaded(hass, entry)]
+    if not entries:
+        raise ServiceValidationError(f"대상 config entry 를 찾을 수 없습니다: {entry_id}")
+    return entries
+
+
+def async_register_services(hass):
+    """통합 구성요소 서비스 등록 (첫 번째 config entry 설정 시 한 번)"""
+    if hass.services.has_service(DOMAIN, SERVICE_BACKFILL):
+        return
+
+    async def async_backfill(call):
+        """지난 달들의 월별 사용량을 조회해 장기 통계로 가져오기"""
+        now = datetime.datetime.now()
+        months = [
+            "%04d%02d" % add_months(now.year, now.month, -offset)
+            for offset in range(call.data["months"], 0, -1)
+        ]
+
+        # 한 설정이 실패해도 나머지 설정은 계속 가져오고, 실패한 설정은 마지막에 한 번에 알림
+        errors = []
+        for entry in _target_entries(hass, call):
+            api = hass.data[DOMAIN][entry.entry_id]["api"]
+            try:
+                history = await api.get_monthly_history(months)
+            except KocomEnergyError as e:
+                _LOGGER.error(f"{entry.title} 월별 이력 조회 실패: {e}")
+                errors.append(f"{entry.title} ({e})")
+                continue
+
+            _LOGGER.info(f"{entry.title} 월별 이력 {len(history)}/{len(months)}개월 조회")
+            if not history:
+                errors.append(f"{entry.title} (조회된 월별 이력 없음)")
+                continue
+
+            # 시간별 통계가 기록 중이면 그 이전 달만 sum 이 이어지도록 가져옴
+            async_import_monthly_statistics(hass, entry, history, hass.data[DOMAIN][entry.entry_id].get("statistics"))
+
+        if errors:
+            raise HomeAssistantError(f"월별 이력 조회에 실패하였습니다: {', '.join(errors)}")
+
+    hass.services.async_register(DOMAIN, SERVICE_BACKFILL, async_backfill, schema=BACKFILL_SCHEMA)
+
+    async def async_refresh(call):
+        """에너지 사용량 즉시 갱신
+
+        짧은 시간 안에 반복된 요청은 coordinator debouncer 가 한 번으로 합치고,
+        예약된 폴링과 겹치면 진행 중인 조회 결과를 함께 사용한다.
+        """
+        await asyncio.gather(*(
+            hass.data[DOMAIN][entry.entry_id]["coordinator"].async_request_refresh()
+            for entry in _target_entries(hass, call)
+        ))
+
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, async_refresh, schema=REFRESH_SCHEMA)
+
+    async def async_profile(call):
+        """지정한 시간 동안 cProfile/tracemalloc 측정 후 config/kocom_energy 에 결과 저장"""
+        # 측정하지 않을 때는 불러오지도 않음
+        from .profiler import Profiler
+
+        # 측정 중 여부를 공유하도록 한 번만 생성
+        if (profiler := hass.data[DOMAIN].get("profiler")) is None:
+            profiler = hass.data[DOMAIN]["profiler"] = Profiler(hass)
+        try:
+            path = await profiler.async_run(call.data["seconds"])
+        except (RuntimeError, ValueError) as e:
+            # 이미 측정 중이거나 다른 프로파일러가 실행 중인 경우
+            raise HomeAssistantError(f"프로파일링을 시작할 수 없습니다: {e}") from e
+
+        _LOGGER.warning(f"프로파일링 완료 : {path}")
+
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA)
+
+
+def async_unregister_services(hass):
+    """마지막 config entry 제거 시 서비스 해제"""
+    hass.services.async_remove(DOMAIN, SERVICE_BACKFILL)
+    hass.services.async_remove(DOMAIN, SERVICE_REFRESH)
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
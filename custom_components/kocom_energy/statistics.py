@@ -0,0 +1,164 @@
+import datetime
+import logging
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import DOMAIN, UTILITY_UNITS
+from .util import add_months
+
+
+_LOGGER = logging.getLogger(__name__)
+
+def statistic_id(entry, utility):
+    """config entry 의 유틸리티별 외부 통계 ID (kocom_energy:<사용자>_<유틸리티>)"""
+    user = entry.data.get("original_username") or entry.entry_id
+    return f"{DOMAIN}:{slugify(user)}_{utility}"
+
+
+def statistic_metadata(entry, utility):
+    return StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        name=f"Kocom {utility.replace('_', ' ').title()} ({entry.title})",
+        source=DOMAIN,
+        statistic_id=statistic_id(entry, utility),
+        unit_of_measurement=UTILITY_UNITS[utility],
+    )
+
+
+def month_start(ym):
+    """YYYYMM 월의 첫 시각 (로컬 시간대 기준, UTC 변환)"""
+    start = datetime.datetime(int(ym[:4]), int(ym[4:6]), 1, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return dt_util.as_utc(start)
+
+
+def async_import_monthly_statistics(hass, entry, history, writer=None):
+    """월별 이력 {년월: {유틸리티: 사용량}} 을 유틸리티별 장기 통계로 한 번에 가져오기
+
+    각 월 사용량은 해당 월 첫 시간에 기록되며 sum 은 가장 오래된 월부터 누적한다.
+    시간별 통계 기록(writer)이 시작된 유틸리티는 그 이전에 끝난 달만 가져오고,
+    마지막 달의 sum 이 시간별 통계의 시작 sum 과 이어지도록 거꾸로 누적한다.
+    """
+    months = sorted(history)
+    for utility in UTILITY_UNITS:
+        anchor = writer.anchor(utility) if writer is not None else None
+        if anchor is None:
+            total = 0.0
+            statistics = []
+            for ym in months:
+                usage = history[ym].get(utility)
+                if usage is None:
+                    continue
+                total += usage
+                statistics.append(StatisticData(start=month_start(ym), state=usage, sum=total))
+        else:
+            start, total = anchor
+            statistics = []
+            for ym in reversed(months):
+                usage = history[ym].get(utility)
+                if usage is None or month_start("%04d%02d" % add_months(int(ym[:4]), int(ym[4:6]), 1)) > start:
+                    continue
+                statistics.append(StatisticData(start=month_start(ym), state=usage, sum=total))
+                total -= usage
+            statistics.reverse()
+
+        if statistics:
+            _LOGGER.debug(f"{statistic_id(entry, utility)} 장기 통계 {len(statistics)}건 가져오기")
+            async_add_external_statistics(hass, statistic_metadata(entry, utility), statistics)
+
+
+class HourlyStatisticsWriter:
+    """폴링마다 유틸리티별 시간 단위 외부 통계를 이어서 기록 (에너지 대시보드용)
+
+    UsageDeltaEngine 이 계산한 폴링 간 사용량을 이전 폴링부터 이번 폴링까지 지난 시간에 비례해
+    해당 시간 행들에 나누어 누적 합(sum)에 더한다. 09:00:05 와 10:00:05 폴링 사이 사용량은 거의 전부 09시 행에,
+    하루 간격 폴링이면 24개 시간 행에 고르게 기록된다 (이미 기록한 시간 행은 덮어씀).
+    월 누계 검침값은 state 로 남긴다 (검침값이 없는 시간은 이전 폴링 검침값).
+    월이 바뀌어 검침값이 초기화되어도 sum 은 계속 증가하므로 recorder 가 상태 이력을 다시 집계할 필요가 없다.
+    유틸리티별 sum 은 config entry 저장소에 보관하고, 저장된 값이 없으면 recorder 의 마지막 통계에서 이어서 시작한다.
+    """
+
+    def __init__(self, hass, entry, state=None):
+        self.hass = hass
+        self.entry = entry
+
+        # 유틸리티별 {"sum": 누적 합, "hour": 마지막으로 기록한 시간(UTC ISO),
+        #            "polled": 마지막 폴링 시각, "state": 마지막 폴링 검침값,
+        #            "start": 처음 기록한 시간, "base": 처음 기록하기 전 sum}
+        self._sums = {utility: dict(value) for utility, value in (state or {}).items()}
+
+    def as_dict(self):
+        """저장용 상태 (내부 값과 분리된 복사본)"""
+        return {utility: dict(value) for utility, value in self._sums.items()}
+
+    async def async_seed(self):
+        """저장된 sum 이 없는 유틸리티는 recorder 에 남아 있는 마지막 통계(월별 이력 등)의 sum 에서 시작"""
+        for utility in UTILITY_UNITS:
+            if utility in self._sums:
+                continue
+            sid = statistic_id(self.entry, utility)
+            last = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics, self.hass, 1, sid, True, {"sum"}
+            )
+            rows = last.get(sid)
+            total = rows[0]["sum"] if rows and rows[0].get("sum") is not None else 0.0
+            _LOGGER.debug(f"{sid} 시간별 통계 시작 sum : {total}")
+            self._sums[utility] = {"sum": total}
+
+    def anchor(self, utility):
+        """시간별 통계를 처음 기록한 시각과 그 이전 sum (기록 전이면 None)"""
+        value = self._sums.get(utility)
+        if value is None or "start" not in value:
+            return None
+        return dt_util.parse_datetime(value["start"]), value["base"]
+
+    def update(self, deltas, values, now):
+        """폴링 간 사용량을 지난 시간 행들에 나누어 반영 후 기록
+
+        deltas : 유틸리티별 이전 폴링 이후 사용량 (UsageDeltaEngine.update 결과)
+        values : 유틸리티별 이번달 누계 (state)
+        now    : 현재 시각 (timezone aware datetime)
+        """
+        now = dt_util.as_utc(now)
+        current = now.replace(minute=0, second=0, microsecond=0)
+        for utility, delta in deltas.items():
+            value = self._sums.get(utility)
+            if value is None:
+                continue
+
+            previous = dt_util.parse_datetime(value["polled"]) if "polled" in value else now
+            previous_state = value.get("state", values[utility])
+            value["polled"] = now.isoformat()
+            value["state"] = values[utility]
+
+            # 사용량 변화가 없으면 새 시간의 첫 폴링에만 기록
+            if not delta and value.get("hour") == current.isoformat():
+                continue
+
+            if "start" not in value:
+                value["start"] = current.isoformat()
+                value["base"] = value["sum"]
+
+            # 이전 폴링 시간부터 이번 시간까지 각 시간 행에 지난 시간 비율만큼 사용량 배분
+            span = (now - previous).total_seconds()
+            hour = min(previous.replace(minute=0, second=0, microsecond=0), current)
+            total = value["sum"]
+            statistics = []
+            while hour <= current:
+                end = hour + datetime.timedelta(hours=1)
+                if span > 0:
+                    total += delta * max(0.0, (min(end, now) - max(hour, previous)).total_seconds()) / span
+                elif hour == current:
+                    total += delta
+                state = values[utility] if hour == current else previous_state
+                statistics.append(StatisticData(start=hour, state=state, sum=round(total, 6)))
+                hour = end
+
+            value["sum"] = round(total, 6)
+            value["hour"] = current.isoformat()
+
+            async_add_external_statistics(self.hass, statistic_metadata(self.entry, utility), statistics)
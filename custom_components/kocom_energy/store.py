@@ -0,0 +1,40 @@
+import logging
+
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_VERSION, STORAGE_SAVE_DELAY
+
+
+_LOGGER = logging.getLogger(__name__)
+
+class KocomEnergyStore:
+    """config entry 별로 HA storage(.storage/kocom_energy.<entry_id>)에 보관하는 데이터"""
+
+    def __init__(self, hass, entry_id):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._data = {}
+
+    async def async_load(self):
+        """저장된 데이터 로드"""
+        self._data = await self._store.async_load() or {}
+        _LOGGER.debug(f"저장 데이터 로드 : {list(self._data)}")
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def set(self, key, value):
+        """값 변경 후 지연 저장. None 이면 항목 삭제"""
+        if value is None:
+            if key not in self._data:
+                return
+            self._data.pop(key)
+        elif self._data.get(key) == value:
+            return
+        else:
+            self._data[key] = value
+
+        self._store.async_delay_save(lambda: self._data, STORAGE_SAVE_DELAY)
+
+    async def async_remove(self):
+        """config entry 삭제 시 저장 파일 제거"""
+        await self._store.async_remove()
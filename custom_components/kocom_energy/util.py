@@ -1,6 +1,9 @@
+import re
 import struct
 import hashlib
 
+from .exceptions import IpAddressNotFoundError
+
 
 
 def string_to_hex(s):
@@ -45,3 +48,17 @@ def string_to_padded_hex(input_string, size):
     padded_hex_string = hex_string.ljust(size, "0")
 
     return padded_hex_string
+
+
+def add_months(year, month, delta):
+    """(년, 월)에 delta 개월을 더한 (년, 월) 반환. delta 가 음수면 이전 달"""
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+def parse_server_ip(text):
+    """SvrInfo.php 응답에서 단지 서버 IP 추출"""
+    match = re.search(r'3 => ([\d\.]+)', text)
+    if not match:
+        raise IpAddressNotFoundError("IP address not found in the response")
+    return match.group(1)
@@ -0,0 +1,73 @@
+"""에너지 응답 해석 마이크로 벤치마크
+
+기존 hex 문자열 슬라이싱 방식과 decoder.decode_energy(struct + memoryview) 방식의
+응답 1건당 해석 시간을 비교한다.
+
+    python tools/bench_decoder.py [--number 20000]
+"""
+import argparse
+import os
+import struct
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.kocom_energy.decoder import LAYOUTS, decode_energy  # noqa: E402
+from custom_components.kocom_energy.util import hex_to_ascii, hex_to_double  # noqa: E402
+
+
+def build_response(disp_type):
+    """레이아웃에 맞는 임의의 에너지 응답 패킷 생성"""
+    layout = LAYOUTS[disp_type]
+    data = bytearray(layout.offset + layout.stride * len(layout.keys))
+    data[0:4] = b"\x78\x56\x34\x12"
+    ym_offset = 4
+    usage_offset = 20 if disp_type == "0100" else 24
+    for index, (ym_key, _) in enumerate(layout.keys):
+        base = layout.offset + layout.stride * index
+        ym = b"202401" if disp_type == "0100" else b"2024-01"
+        data[base + ym_offset : base + ym_offset + len(ym)] = ym
+        struct.pack_into("<d", data, base + usage_offset, 100.5 + index)
+    return bytes(data)
+
+
+def legacy_decode(disp_type, data):
+    """기존 api.py 의 hex 문자열 슬라이싱 방식"""
+    response = data.hex()
+    result = {}
+    if disp_type == "0100":
+        for index, (ym_key, usage_key) in enumerate(LAYOUTS["0100"].keys):
+            start_idx = 64 + 56 * index
+            if ym_key is not None:
+                result[ym_key] = hex_to_ascii(response[start_idx + 8 : start_idx + 24])
+            result[usage_key] = hex_to_double(response[start_idx + 40 : start_idx + 56])
+    else:
+        for index, (ym_key, usage_key) in enumerate(LAYOUTS["0300"].keys):
+            start_idx = 184 + 88 * index
+            if ym_key is not None:
+                result[ym_key] = hex_to_ascii(response[start_idx + 8 : start_idx + 22])
+            result[usage_key] = hex_to_double(response[start_idx + 48 : start_idx + 64])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    for disp_type in LAYOUTS:
+        data = build_response(disp_type)
+        assert legacy_decode(disp_type, data) == decode_energy(disp_type, data).as_dict()
+
+        legacy = min(timeit.repeat(lambda: legacy_decode(disp_type, data), number=args.number, repeat=5))
+        table = min(timeit.repeat(lambda: decode_energy(disp_type, data), number=args.number, repeat=5))
+        print(
+            f"{disp_type}: legacy {legacy / args.number * 1e6:.2f} us, "
+            f"decoder {table / args.number * 1e6:.2f} us, "
+            f"x{legacy / table:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
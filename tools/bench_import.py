@@ -0,0 +1,122 @@
+"""통합 구성요소 import 시간 벤치마크
+
+모듈마다 새 인터프리터에서 python -X importtime 으로 import 시간을 측정하고,
+폴링 경로 모듈이 설정 화면 전용 모듈이나 제거한 의존성을 불러오지 않는지 확인한다.
+HA 가 이미 불러온 표준 라이브러리(asyncio, datetime 등)는 미리 import 해 두므로
+통합 구성요소가 추가로 드는 시간만 측정된다.
+
+    python tools/bench_import.py [--repeat 5] [--budget-ms 30]
+
+측정값(반복 중 최소)이 budget 을 넘거나 금지된 모듈을 불러오면 종료 코드 1.
+homeassistant 가 설치되지 않은 환경에서는 HA 에 의존하는 모듈을 건너뛴다.
+"""
+import argparse
+import compileall
+import importlib.util
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PACKAGE = "custom_components.kocom_energy"
+
+# HA 실행 중에는 이미 불러온 상태인 모듈 (측정에서 제외)
+PRELOADED = (
+    "asyncio", "datetime", "logging", "json", "re", "struct", "hashlib", "random",
+    "functools", "contextlib", "bisect", "time", "os", "math", "mmap",
+)
+
+# HA 설치 시 함께 설치되는 패키지 (없으면 해당 모듈 측정 생략)
+HA_DEPENDENCIES = ("homeassistant", "aiohttp", "voluptuous")
+
+# HA 가 통합 구성요소보다 먼저 불러오는 HA 모듈 (설치된 경우에만 미리 import)
+HA_PRELOADED = (
+    "aiohttp", "voluptuous", "homeassistant.core", "homeassistant.config_entries",
+    "homeassistant.helpers.update_coordinator", "homeassistant.helpers.storage",
+    "homeassistant.helpers.aiohttp_client", "homeassistant.components.sensor",
+    "homeassistant.components.recorder.statistics",
+)
+
+# 측정할 모듈 : 불러오면 안 되는 모듈
+MODULES = {
+    PACKAGE: ("dateutil", "async_timeout", "voluptuous", f"{PACKAGE}.api"),
+    f"{PACKAGE}.api": ("dateutil", "async_timeout", "voluptuous", "aiohttp", "homeassistant"),
+    f"{PACKAGE}.protocol": ("dateutil", "aiohttp", "homeassistant"),
+    f"{PACKAGE}.decoder": ("dateutil", "aiohttp", "homeassistant"),
+    f"{PACKAGE}.sensor": ("dateutil", "async_timeout", f"{PACKAGE}.config_flow"),
+    f"{PACKAGE}.config_flow": (
+        "dateutil", "async_timeout", f"{PACKAGE}.api", f"{PACKAGE}.protocol", f"{PACKAGE}.discovery",
+    ),
+}
+
+
+def measure(module):
+    """새 인터프리터에서 module import. (누적 시간 us, 새로 불러온 모듈 목록) 또는 HA 미설치 시 None"""
+    preloaded = PRELOADED
+    if importlib.util.find_spec("homeassistant") is not None:
+        preloaded += HA_PRELOADED
+    code = f"import {', '.join(preloaded)}; import {module}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        if any(f"No module named '{name}'" in proc.stderr for name in HA_DEPENDENCIES):
+            return None
+        raise RuntimeError(f"{module} import 실패\n{proc.stderr[-2000:]}")
+
+    cumulative = 0
+    imported = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue
+        if not name.startswith("  ") and name.strip() != module:
+            # 미리 불러온 모듈 (그 전까지 기록된 하위 모듈 포함) 은 제외
+            imported = []
+            continue
+        name = name.strip()
+        imported.append(name)
+        if name == module:
+            cumulative = int(cumulative_us)
+    return cumulative, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=30.0, help="모듈별 import 시간 상한")
+    args = parser.parse_args()
+
+    # HA 실행 환경과 같이 bytecode 캐시가 있는 상태에서 측정 (소스 컴파일 시간 제외)
+    compileall.compile_dir(os.path.join(ROOT, "custom_components"), quiet=1)
+
+    failed = False
+    for module, forbidden in MODULES.items():
+        results = [measure(module) for _ in range(args.repeat)]
+        if results[0] is None:
+            print(f"{module:<45} skipped (homeassistant 미설치)")
+            continue
+
+        best = min(cumulative for cumulative, _ in results) / 1000
+        imported = results[0][1]
+        loaded = sorted({
+            name for name in imported for prefix in forbidden
+            if name == prefix or name.startswith(prefix + ".")
+        })
+
+        status = "ok"
+        if best > args.budget_ms:
+            status = f"over budget ({args.budget_ms} ms)"
+        if loaded:
+            status = f"imports {', '.join(loaded)}"
+        failed |= status != "ok"
+        print(f"{module:<45} {best:7.1f} ms  {len(imported):3d} modules  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
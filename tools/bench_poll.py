@@ -0,0 +1,154 @@
+"""폴링 지연 시간 벤치마크 (에뮬레이터 사용)
+
+로컬 에뮬레이터를 띄우고 API 를 통해 다음을 측정한다.
+
+- 단계별 지연 : 연결+인증, 세대 정보(메뉴/주소), 에너지 조회
+- 전체 폴링 지연 : 새 연결(cold), 세대 정보가 캐시된 새 연결(cold+metadata), 유지된 연결(warm)
+- 동시성 1, 10, 100 에서의 초당 폴링 수
+
+    python tools/bench_poll.py [--latency 0.005] [--fragment 0] [--duration 3] [--fleet] [--pipelining]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from emulator import KocomEmulator  # noqa: E402
+from custom_components.kocom_energy.api import API  # noqa: E402
+from custom_components.kocom_energy.fleet import FleetScheduler  # noqa: E402
+from custom_components.kocom_energy.exceptions import KocomEnergyError  # noqa: E402
+from custom_components.kocom_energy.protocol import credential_fields  # noqa: E402
+
+
+def make_api(port, index=0, scheduler=None, keepalive_interval=0, pipelining=False, metadata=None):
+    api = API(
+        ip="127.0.0.1",
+        **credential_fields(f"user{index}", "password"),
+        keepalive_interval=keepalive_interval,
+        scheduler=scheduler,
+        pipelining=pipelining,
+        metadata=metadata,
+    )
+    api.port = port
+    return api
+
+
+def summary(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"p50 {statistics.median(samples) * 1000:7.2f} ms, p95 {p95 * 1000:7.2f} ms"
+
+
+async def bench_phases(port, rounds):
+    """단계별 지연 (단계마다 API 내부 메서드를 직접 호출)"""
+    phases = {"connect+auth": [], "metadata": [], "energy": []}
+    for _ in range(rounds):
+        api = make_api(port)
+        async with api._lock:
+            start = time.perf_counter()
+            await api._connect()
+            phases["connect+auth"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            api.metadata = await api._query_metadata()
+            phases["metadata"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await api._query_energy()
+            phases["energy"].append(time.perf_counter() - start)
+
+            await api._disconnect()
+
+    for name, samples in phases.items():
+        print(f"  {name:<14} {summary(samples)}")
+
+
+async def bench_end_to_end(port, rounds, pipelining):
+    """새 연결(cold) / 세대 정보가 캐시된 새 연결(cold+metadata) / 유지된 연결(warm) 전체 폴링 지연"""
+    cold = []
+    cold_metadata = []
+    for _ in range(rounds):
+        api = make_api(port, pipelining=pipelining)
+        start = time.perf_counter()
+        assert await api.get_energy_data()
+        cold.append(time.perf_counter() - start)
+        await api.close()
+
+        api = make_api(port, pipelining=pipelining, metadata=api.metadata)
+        start = time.perf_counter()
+        assert await api.get_energy_data()
+        cold_metadata.append(time.perf_counter() - start)
+        await api.close()
+
+    warm = []
+    api = make_api(port, pipelining=pipelining)
+    await api.get_energy_data()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        assert await api.get_energy_data()
+        warm.append(time.perf_counter() - start)
+    await api.close()
+
+    print(f"  {'cold':<14} {summary(cold)}")
+    print(f"  {'cold+metadata':<14} {summary(cold_metadata)}")
+    print(f"  {'warm':<14} {summary(warm)}")
+
+
+async def bench_throughput(port, concurrency, duration, fleet, pipelining):
+    """동시에 폴링하는 세대 수별 초당 폴링 수"""
+    scheduler = FleetScheduler(max_concurrency=concurrency, max_per_server=concurrency, rate_per_server=1e9, burst_per_server=concurrency) if fleet else None
+    apis = [make_api(port, index, scheduler, pipelining=pipelining) for index in range(concurrency)]
+    counts = [0] * concurrency
+    failures = [0] * concurrency
+    deadline = time.perf_counter() + duration
+
+    async def worker(index):
+        while time.perf_counter() < deadline:
+            try:
+                await apis[index].get_energy_data()
+                counts[index] += 1
+            except KocomEnergyError:
+                failures[index] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await asyncio.gather(*(api.close() for api in apis))
+
+    print(f"  concurrency {concurrency:>3} : {sum(counts) / elapsed:9.1f} polls/s (failures {sum(failures)})")
+
+
+async def _main(args):
+    async with KocomEmulator(disp_type=args.disp_type, latency=args.latency, fragment=args.fragment) as emulator:
+        print(
+            f"emulator 127.0.0.1:{emulator.port} disp_type={args.disp_type} latency={args.latency}s "
+            f"fragment={args.fragment} pipelining={args.pipelining}"
+        )
+        print("phase latency")
+        await bench_phases(emulator.port, args.rounds)
+        print("end-to-end poll latency")
+        await bench_end_to_end(emulator.port, args.rounds, args.pipelining)
+        print("throughput")
+        for concurrency in (1, 10, 100):
+            await bench_throughput(emulator.port, concurrency, args.duration, args.fleet, args.pipelining)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--disp-type", choices=("0100", "0300"), default="0100")
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--fragment", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--fleet", action="store_true", help="FleetScheduler 를 거쳐 폴링")
+    parser.add_argument("--pipelining", action="store_true", help="파이프라인 모드로 폴링")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""코콤 단지 서버(15000 포트) 에뮬레이터
+
+실제 단지 서버 없이 API.authenticate / API.get_energy_data 를 실행해 볼 수 있도록
+인증, 메뉴(0100/0300 조회 유형), 주소, 에너지 요청에 응답한다.
+응답 지연, 패킷 분할, 장애 주입을 설정할 수 있다.
+--svrinfo-port 를 지정하면 단지 서버 IP 조회(SvrInfo.php)를 대신하는 http 서버도 함께 실행한다.
+
+    python tools/emulator.py --port 15000 --disp-type 0300 --latency 0.05 --fragment 16
+    python tools/emulator.py --svrinfo-port 8080   # DISCOVERY_URL = http://127.0.0.1:8080/SvrInfo.php
+"""
+import argparse
+import asyncio
+import logging
+import random
+import struct
+import sys
+import os
+import time
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.kocom_energy.decoder import LAYOUTS  # noqa: E402
+# 요청 opcode 와 헤더 형식은 통합 구성요소의 protocol 모듈과 공유 (응답은 요청 opcode + 1)
+from custom_components.kocom_energy.protocol import (  # noqa: E402
+    ERROR_RESPONSE_PREFIX,
+    HEADER,
+    MAGIC,
+    OP_ADDR,
+    OP_AUTH,
+    OP_ENERGY_TYPE_1,
+    OP_ENERGY_TYPE_3,
+    OP_MENU,
+    encode_frame as frame,
+    frame_opcode,
+)
+
+
+_LOGGER = logging.getLogger("kocom_emulator")
+
+# 오류 응답 opcode (opcode 하위 byte 가 0x10)
+OP_ERROR = frame_opcode(ERROR_RESPONSE_PREFIX + b"\x00")
+
+USAGE = struct.Struct("<d")
+
+# 주입 가능한 장애 유형
+FAILURES = ("drop", "garbage", "truncate", "error", "stall")
+
+
+class KocomEmulator:
+    """asyncio 기반 단지 서버 에뮬레이터
+
+    disp_type : 메뉴 응답의 에너지 조회 유형 (0100 / 0300)
+    latency   : 요청 도착부터 응답까지의 지연 시간 (초, 이어서 도착한 요청끼리는 겹쳐서 흐름)
+    fragment  : 0 보다 크면 응답을 해당 크기(bytes)로 나누어 전송
+    fail_rate : 요청마다 장애를 주입할 확률 (0 ~ 1)
+    failures  : 주입할 장애 유형 (FAILURES 중 선택)
+    auth      : (username, password) 인증 payload 를 지정하면 일치할 때만 인증 성공
+    max_months: 0100 에너지 요청 한 건에 허용할 최대 개월 수 (초과 시 오류 응답)
+    min_months: 0100 에너지 요청 한 건에 필요한 최소 개월 수 (미만 시 오류 응답, 이번달만 요청 거부 서버 흉내)
+    pipelining: False 이면 앞선 요청의 응답을 보내기 전에 도착한 요청은 무시 (파이프라인 미지원 서버 흉내)
+    """
+
+    def __init__(
+        self,
+        disp_type="0100",
+        latency=0.0,
+        fragment=0,
+        fail_rate=0.0,
+        failures=FAILURES,
+        auth=None,
+        town=0x0001,
+        dong=0x0065,
+        ho=0x03E9,
+        seed=None,
+        max_months=12,
+        min_months=1,
+        pipelining=True,
+    ):
+        self.disp_type = disp_type
+        self.latency = latency
+        self.fragment = fragment
+        self.fail_rate = fail_rate
+        self.failures = failures
+        self.auth = auth
+        self.town = town
+        self.dong = dong
+        self.ho = ho
+        self.max_months = max_months
+        self.min_months = min_months
+        self.pipelining = pipelining
+        self._random = random.Random(seed)
+        self._server = None
+        # 열린 연결 (disconnect_all 로 서버 측 유휴 연결 종료 흉내)
+        self._writers = set()
+
+        # 요청 유형별 처리 건수 (벤치마크/검증용)
+        self.counters = {}
+        # 에너지 사용량 증가분 (tick 호출 시마다 증가)
+        self.ticks = 0
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def disconnect_all(self):
+        """열린 연결을 모두 서버 측에서 종료 (유휴 연결 timeout 흉내)"""
+        for writer in list(self._writers):
+            writer.close()
+
+    def tick(self, count=1):
+        """사용량 카운터 증가 (서버 측 검침값 갱신 흉내)"""
+        self.ticks += count
+
+    def usage(self, ym, utility_index):
+        """년월/유틸리티별 결정적인 사용량 값"""
+        digits = "".join(c for c in ym if c.isdigit())
+        return float(int(digits[-2:] or 0) * 10 + utility_index) + self.ticks * 0.5
+
+    async def _receive(self, reader, queue, state):
+        """요청을 읽어 queue 로 전달 (앞선 요청의 응답 전에 도착했는지 함께 기록). 연결 종료 시 None"""
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                magic, opcode, flags, length, fields = HEADER.unpack(header)
+                if magic != MAGIC:
+                    _LOGGER.warning("잘못된 요청 헤더: %s", header.hex())
+                    return
+                payload = await reader.readexactly(length)
+                queue.put_nowait((header, payload, time.monotonic(), state["busy"] or not queue.empty()))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            queue.put_nowait(None)
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        queue = asyncio.Queue()
+        state = {"busy": False}
+        receiver = asyncio.ensure_future(self._receive(reader, queue, state))
+        try:
+            while True:
+                state["busy"] = False
+                request = await queue.get()
+                if request is None:
+                    return
+                header, payload, arrived, pipelined = request
+                opcode = HEADER.unpack(header)[1]
+                state["busy"] = True
+
+                if pipelined and not self.pipelining:
+                    _LOGGER.debug("응답 전에 도착한 요청 무시 (opcode %04x)", opcode)
+                    continue
+                self.counters[opcode] = self.counters.get(opcode, 0) + 1
+
+                if self.fail_rate and self._random.random() < self.fail_rate:
+                    failure = self._random.choice(self.failures)
+                    _LOGGER.debug("장애 주입: %s (opcode %04x)", failure, opcode)
+                    if failure == "drop":
+                        return
+                    if failure == "garbage":
+                        await self._send(writer, b"\x00" * HEADER.size)
+                        continue
+                    if failure == "truncate":
+                        response = self._respond(opcode, header, payload)
+                        await self._send(writer, response[: len(response) // 2])
+                        return
+                    if failure == "error":
+                        await self._send(writer, frame(OP_ERROR, b"\x00" * 4))
+                        continue
+                    if failure == "stall":
+                        await asyncio.sleep(3600)
+                        return
+
+                if self.latency:
+                    await asyncio.sleep(max(0.0, arrived + self.latency - time.monotonic()))
+
+                response = self._respond(opcode, header, payload)
+                if response is None:
+                    _LOGGER.warning("알 수 없는 요청 opcode: %04x", opcode)
+                    return
+                await self._send(writer, response)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            receiver.cancel()
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _send(self, writer, data):
+        if self.fragment <= 0:
+            writer.write(data)
+            await writer.drain()
+            return
+
+        for index in range(0, len(data), self.fragment):
+            writer.write(data[index : index + self.fragment])
+            await writer.drain()
+            await asyncio.sleep(0)
+
+    def _respond(self, opcode, header, payload):
+        if opcode == OP_AUTH:
+            if self.auth is not None and payload[24:104] != b"".join(self.auth):
+                return frame(OP_AUTH + 1, b"\x01\x00\x00\x00")
+            return frame(OP_AUTH + 1, b"\x00\x00\x00\x00")
+
+        if opcode == OP_MENU:
+            body = bytearray(24)
+            body[20:22] = bytes.fromhex(self.disp_type)
+            return frame(OP_MENU + 1, bytes(body))
+
+        if opcode == OP_ADDR:
+            fields = struct.pack("<H2xH2xH", self.town, self.dong, self.ho)
+            return frame(OP_ADDR + 1, b"\x00" * 32, fields)
+
+        if opcode == OP_ENERGY_TYPE_1:
+            months = payload.rstrip(b"\x00").decode("ascii").split(",")
+            if not self.min_months <= len(months) <= self.max_months:
+                return frame(OP_ERROR, b"\x00" * 4)
+            return frame(OP_ENERGY_TYPE_1 + 1, self._energy_body("0100", months))
+
+        if opcode == OP_ENERGY_TYPE_3:
+            month = payload[12:19].decode("ascii")
+            return frame(OP_ENERGY_TYPE_3 + 1, self._energy_body("0300", [month]))
+
+        return None
+
+    def _energy_body(self, disp_type, months):
+        """조회 유형 레이아웃에 맞춘 에너지 응답 payload"""
+        layout = LAYOUTS[disp_type]
+        count = len(layout.utilities) * len(months)
+        body = bytearray(layout.offset - HEADER.size + layout.stride * count)
+        usage_offset = 20 if disp_type == "0100" else 24
+        ym_size = 8 if disp_type == "0100" else 7
+
+        index = 0
+        for month in months:
+            for utility_index, _ in enumerate(layout.utilities):
+                base = layout.offset - HEADER.size + layout.stride * index
+                body[base + 4 : base + 4 + ym_size] = month.encode("ascii")[:ym_size].ljust(ym_size, b"\x00")
+                USAGE.pack_into(body, base + usage_offset, self.usage(month, utility_index))
+                index += 1
+        return bytes(body)
+
+
+class SvrInfoEmulator:
+    """단지 서버 IP 조회(SvrInfo.php) http 응답 흉내
+
+    ip        : 응답할 단지 서버 IP (servers 에 없는 아이디에 사용)
+    servers   : 아이디별 단지 서버 IP (서버 이전 흉내)
+    """
+
+    def __init__(self, ip="127.0.0.1", servers=None):
+        self.ip = ip
+        self.servers = dict(servers or {})
+        self.requests = []
+        self._server = None
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/SvrInfo.php"
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1")
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            method, target = (request_line.split() + ["", ""])[:2]
+            url = urlsplit(target)
+            uid = parse_qs(url.query).get("uid", [""])[0]
+            self.requests.append(uid)
+
+            if method != "GET" or url.path != "/SvrInfo.php":
+                status, body = "404 Not Found", ""
+            else:
+                ip = self.servers.get(uid, self.ip)
+                status, body = "200 OK", f"0 => {uid}\n1 => 15000\n2 => 0\n3 => {ip}\n" if ip else ""
+
+            data = body.encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/html; charset=UTF-8\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _main(args):
+    emulator = KocomEmulator(
+        disp_type=args.disp_type,
+        latency=args.latency,
+        fragment=args.fragment,
+        fail_rate=args.fail_rate,
+        seed=args.seed,
+        pipelining=not args.no_pipelining,
+    )
+    await emulator.start(args.host, args.port)
+    _LOGGER.info("에뮬레이터 시작: %s:%s (조회 유형 %s)", args.host, emulator.port, args.disp_type)
+
+    svrinfo = None
+    if args.svrinfo_port is not None:
+        svrinfo = await SvrInfoEmulator(ip=args.host).start(args.host, args.svrinfo_port)
+        _LOGGER.info("SvrInfo 에뮬레이터 시작: http://%s:%s/SvrInfo.php", args.host, svrinfo.port)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await emulator.stop()
+        if svrinfo is not None:
+            await svrinfo.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=15000)
+    parser.add_argument("--disp-type", choices=sorted(LAYOUTS), default="0100")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fragment", type=int, default=0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--no-pipelining", action="store_true", help="응답 전에 이어서 도착한 요청 무시")
+    parser.add_argument("--svrinfo-port", type=int, help="SvrInfo.php 에뮬레이터 포트 (지정 시 실행)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""패킷 캡처 재생 도구
+
+통합 구성요소의 패킷 캡처 파일(config/kocom_energy/capture_<entry_id>.bin)을 읽어
+에너지 응답을 디코더로 다시 해석한다. 서버에 다시 요청하지 않고 응답 형식 변경이나
+이상치를 재현할 수 있다.
+
+    python tools/replay.py capture_xxx.bin [--json] [--repeat 1000]
+"""
+import argparse
+import datetime
+import json
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.kocom_energy.capture import CAPTURE_TX, read_capture  # noqa: E402
+from custom_components.kocom_energy.decoder import (  # noqa: E402
+    CLOSED_MONTH_FIELDS,
+    decode_current_month,
+    decode_energy,
+    decode_history,
+)
+from custom_components.kocom_energy.protocol import HEADER, MAGIC  # noqa: E402
+
+# 응답 opcode
+OP_MENU_RESPONSE = 0x0BB9
+OP_ENERGY_TYPE_1_RESPONSE = 0x0079
+OP_ENERGY_TYPE_3_RESPONSE = 0x0191
+
+
+def replay(packets):
+    """캡처된 패킷을 순서대로 해석해 (시각, 결과 또는 오류) 반환"""
+    disp_type = None
+    months = 3
+    # 마지막 세 달 응답의 마감 월 값 (이번달만 조회한 응답은 운영 경로와 같이 이 값과 합침)
+    closed = {}
+
+    for timestamp, direction, length, data in packets:
+        if direction == CAPTURE_TX:
+            # 0100 에너지 요청의 조회 개월 수 기억
+            if len(data) >= HEADER.size and struct.unpack_from("<H", data, 4)[0] == OP_ENERGY_TYPE_1_RESPONSE - 1:
+                months = data[HEADER.size :].rstrip(b"\x00").count(b",") + 1
+            continue
+
+        if len(data) < length:
+            yield timestamp, {"error": f"잘린 패킷 (캡처 {len(data)} / 원래 {length} bytes)"}
+            continue
+        if data[:4] != MAGIC:
+            yield timestamp, {"error": f"잘못된 패킷 헤더: {data[:4].hex()}"}
+            continue
+        if data[4] == 0x10:
+            yield timestamp, {"error": f"오류 응답: {data[:8].hex()}"}
+            continue
+
+        opcode = struct.unpack_from("<H", data, 4)[0]
+        try:
+            if opcode == OP_MENU_RESPONSE:
+                disp_type = data[48:50].hex()
+            elif opcode == OP_ENERGY_TYPE_1_RESPONSE:
+                if months == 3:
+                    energy = decode_energy("0100", data)
+                    closed = {key: getattr(energy, key) for key in CLOSED_MONTH_FIELDS}
+                    yield timestamp, energy.as_dict()
+                elif months == 1:
+                    yield timestamp, decode_current_month(data, closed).as_dict()
+                else:
+                    yield timestamp, decode_history(data, months)
+            elif opcode == OP_ENERGY_TYPE_3_RESPONSE:
+                yield timestamp, decode_energy(disp_type or "0300", data).as_dict()
+        except struct.error:
+            yield timestamp, {"error": f"해석 실패 (opcode {opcode:04x}, {len(data)} bytes)"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄씩 출력")
+    parser.add_argument("--repeat", type=int, default=0, help="전체 재생을 반복해 해석 속도 측정")
+    args = parser.parse_args()
+
+    packets = list(read_capture(args.path))
+    print(f"{len(packets)} packets", file=sys.stderr)
+
+    errors = 0
+    for timestamp, result in replay(packets):
+        errors += "error" in result
+        moment = datetime.datetime.fromtimestamp(timestamp).isoformat(timespec="seconds")
+        if args.json:
+            print(json.dumps({"time": moment, **result}, ensure_ascii=False))
+        else:
+            print(moment, result)
+
+    if args.repeat:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for _ in replay(packets):
+                pass
+        elapsed = time.perf_counter() - start
+        print(f"replay x{args.repeat}: {len(packets) * args.repeat / elapsed:,.0f} packets/s", file=sys.stderr)
+
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()